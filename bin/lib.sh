@@ -5,3 +5,13 @@ fzf() {
 list-scenes() {
     ls scenes/*.py | sed -E 's,scenes/(.+)\.py,\1,'
 }
+
+# Run a command that renders with OpenGL on the CPU, using Mesa's software
+# rasterizer, in a virtual X display if there is no display.
+headless() {
+    if [[ -z $DISPLAY ]] && command -v xvfb-run >/dev/null; then
+        LIBGL_ALWAYS_SOFTWARE=1 xvfb-run -a "$@"
+    else
+        LIBGL_ALWAYS_SOFTWARE=1 "$@"
+    fi
+}
@@ -0,0 +1,44 @@
+"""
+The directory of caches shared by renders, and writing entries to them.
+
+Each cache is a subdirectory of TEMPORAL_ANIMATIONS_CACHE_DIR (by default
+scenes/media/cache): the compiled timelines (see schema/timeline.py), the
+videos of the render farm (see manim_renderer/farm.py), and the laid out
+mobjects (see manim_renderer/disk_cache.py). Entries are addressed by a hash
+of what they are made from, so a stale entry is never read, but only the
+mobject cache is bounded in size. The others grow with each edit of a scene or
+of the renderer, and can be removed at any time to reclaim space:
+
+    rm -r scenes/media/cache/timelines scenes/media/cache/videos
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import IO, Iterator
+
+
+def cache_dir(name: str) -> str:
+    """
+    Return the directory of the cache called `name`.
+    """
+    return os.path.join(
+        os.getenv("TEMPORAL_ANIMATIONS_CACHE_DIR", "scenes/media/cache"), name
+    )
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = "w") -> Iterator[IO]:
+    """
+    Open a temporary file next to `path`, and rename it to `path` once
+    written, so that a concurrent or interrupted writer never leaves a partial
+    file at `path`. The temporary file is removed if writing fails.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(".tmp", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, mode) as file:
+            yield file
+    except BaseException:
+        os.remove(tmp)
+        raise
+    os.replace(tmp, path)
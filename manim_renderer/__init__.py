@@ -4,7 +4,11 @@ Create manim animations from actor state change and message events.
 # pyright: reportUnusedImport=false
 from manim_renderer.application import Application
 from manim_renderer.entity import ProxyEntity
-from manim_renderer.event_processor import render_simulation_events, set_scene
+from manim_renderer.event_processor import (
+    render_simulation_events,
+    replay_timeline,
+    set_scene,
+)
 from manim_renderer.nexus import NexusServer, NexusWorker
 from manim_renderer.server import Server
 from manim_renderer.worker import ActivityWorker, WorkflowWorker
@@ -8,13 +8,18 @@ from schema import schema
 
 
 class ApplicationRequest(ProxyEntity[schema.ApplicationRequest]):
+    visual_fields = ("stage", "response_payload", "request_type")
+
     def render(self, entity: schema.ApplicationRequest) -> Mobject:
+        return self.with_time(style.message(self.label(entity)), entity)
+
+    @staticmethod
+    def label(entity: schema.ApplicationRequest) -> str:
         match entity.stage:
             case schema.RequestResponseStage.Response if entity.response_payload:
-                label = str(entity.response_payload)
+                return str(entity.response_payload)
             case _:
-                label = entity.request_type.name
-        return self.with_time(style.message(label), entity)
+                return entity.request_type.name
 
 
 class Application(ProxyEntityWithCode[schema.Application]):
@@ -31,6 +36,9 @@ class Application(ProxyEntityWithCode[schema.Application]):
             DOWN, buff=SMALL_BUFF, aligned_edge=LEFT
         )
 
+    def code_panel(self) -> VDict:
+        return self.mobj["code"]
+
     def dock_point(self) -> Point3D:
         return (
             self.mobj["text"].get_edge_center(self.dock_direction)
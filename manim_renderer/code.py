@@ -3,44 +3,118 @@ from typing import Generic, TypeVar
 from manim import DOWN, LEFT, Arrow, VDict, VGroup, VMobject
 
 from manim_renderer import style
-from manim_renderer.entity import ProxyEntity
+from manim_renderer.disk_cache import mobject_cache
+from manim_renderer.entity import SHOW_LAMPORT_TIMESTAMPS, ProxyEntity
 from manim_renderer.manim_shims import Code
 from schema import schema
 
 E = TypeVar("E", bound=schema.EntityWithCode)
 
+# Highlighted code bodies, keyed by (code, language). See code_body().
+_code_bodies: dict[tuple[str, str], VDict] = {}
+
 
 class ProxyEntityWithCode(ProxyEntity, Generic[E]):
+    """
+    A proxy displaying a code panel. The panel consists of a static body (the
+    highlighted code, and an arrow for every line), built once for given code,
+    and an overlay state (which arrows are visible, and the border of the
+    panel), which is updated in place as the entity changes.
+    """
+
+    BACKGROUND_INDEX = 0
     CODE_LINES_INDEX = 2
+    visual_fields = ("code", "language", "blocked_lines", "active")
+
+    def __init__(self, entity: E, *args, **kwargs):
+        self.code_source = (entity.code, entity.language)
+        super().__init__(entity, *args, **kwargs)
 
     def render(self, entity: E) -> VMobject:
-        code = Code(
-            code=entity.code,
-            language=entity.language,
-            style=style.CODE_SYNTAX_THEME,
-            insert_line_no=False,
-            background_stroke_width=2 if entity.active else 1,
-            background_stroke_color=str(
+        panel = code_body(entity.code, entity.language)
+        self.render_overlay(panel, entity)
+        return panel
+
+    def render_to_scene(self, entity: E):
+        visual_state = self.get_visual_state(entity)
+        if (
+            visual_state != self.visual_state
+            and (entity.code, entity.language) == self.code_source
+            and not SHOW_LAMPORT_TIMESTAMPS
+        ):
+            self.visual_state = visual_state
+            self.render_overlay(self.code_panel(), entity)
+        else:
+            super().render_to_scene(entity)
+        self.code_source = (entity.code, entity.language)
+
+    def code_panel(self) -> VDict:
+        """
+        Return the code panel within self.mobj.
+        """
+        return self.mobj
+
+    @classmethod
+    def render_overlay(cls, panel: VDict, entity: E):
+        """
+        Mutate code `panel` so that its arrows and border represent the
+        blocked lines and active status of `entity`.
+        """
+        panel["code"][cls.BACKGROUND_INDEX].set_stroke(
+            color=(
                 style.COLOR_ACTIVE_CODE if entity.active else style.COLOR_INACTIVE_CODE
             ),
-            corner_radius=style.RECT_CORNER_RADIUS,
-            font_size=style.FONT_SIZE_CODE,
-            font=style.FONT_CODE,
-            line_spacing=0.5,
-        ).to_edge(LEFT, buff=0.1)
-        lines = code[self.CODE_LINES_INDEX]
-        arrows = VGroup(
-            *(
-                Arrow(
-                    start=line.get_edge_center(LEFT) + LEFT,
-                    end=line.get_edge_center(LEFT),
-                )
-                .set_opacity(0)
-                .next_to(line, LEFT, buff=0.1)
-                .shift(DOWN * 0.025)
-                for line in lines
+            width=2 if entity.active else 1,
+        )
+        for line_num, arrow in enumerate(panel["arrows"], 1):
+            if line_num in entity.blocked_lines:
+                arrow.set_color(style.COLOR_CODE_LINE_ARROW).set_opacity(1)
+            else:
+                arrow.set_opacity(0)
+
+
+def code_body(code: str, language: str) -> VDict:
+    """
+    Return a copy of the highlighted code panel for `code`, with all arrows
+    hidden. Pygments highlighting and text layout happen once per distinct
+    code.
+    """
+    key = (code, language)
+    if (body := _code_bodies.get(key)) is None:
+        body = _code_bodies[key] = _load_code_body(code, language)
+    return body.copy()
+
+
+def _load_code_body(code: str, language: str) -> VDict:
+    return mobject_cache.get(
+        ("code_body", code, language), lambda: _render_code_body(code, language)
+    )
+
+
+def _render_code_body(code: str, language: str) -> VDict:
+    code_mobj = Code(
+        code=code,
+        language=language,
+        style=style.CODE_SYNTAX_THEME,
+        insert_line_no=False,
+        background_stroke_width=1,
+        background_stroke_color=str(style.COLOR_INACTIVE_CODE),
+        corner_radius=style.RECT_CORNER_RADIUS,
+        font_size=style.FONT_SIZE_CODE,
+        font=style.FONT_CODE,
+        line_spacing=0.5,
+    ).to_edge(LEFT, buff=0.1)
+    lines = code_mobj[ProxyEntityWithCode.CODE_LINES_INDEX]
+    arrows = VGroup(
+        *(
+            Arrow(
+                start=line.get_edge_center(LEFT) + LEFT,
+                end=line.get_edge_center(LEFT),
             )
+            .set_opacity(0)
+            .next_to(line, LEFT, buff=0.1)
+            .shift(DOWN * 0.025)
+            for line in lines
         )
-        for line_num in entity.blocked_lines:
-            arrows[line_num - 1].set_color(style.COLOR_CODE_LINE_ARROW).set_opacity(1)
-        return VDict({"code": code, "arrows": arrows})
+    )
+    return VDict({"code": code_mobj, "arrows": arrows})
@@ -0,0 +1,159 @@
+"""
+A cache on disk of laid out text and highlighted code, shared by renders.
+
+Each scene is rendered with its own manim media directory, so manim's own text
+cache is not shared between scenes, or between runs in CI. The mobjects built
+by TextCache (see style.py) and code_body() (see code.py) are pickled to a
+directory shared by all renders, TEMPORAL_ANIMATIONS_CACHE_DIR/mobjects (see
+common/cache.py).
+
+Entries are addressed by a hash of what they are built from: their key, the
+version of manim, the renderer (whose mobject classes differ: OpenGL mobjects
+are built for the OpenGL renderer), and the source of the modules laying them
+out, so that editing a style invalidates them. Entries are written to a temporary file and
+renamed, so that concurrent renders never see a partial entry. Reading an
+entry touches it; when the cache grows beyond its size limit, the least
+recently used entries are evicted, by one process at a time, under a lock.
+
+Set TEMPORAL_ANIMATIONS_MOBJECT_CACHE_MB to the size limit in MB; 0 disables
+the cache.
+"""
+import fcntl
+import hashlib
+import os
+import pickle
+from typing import Any, Callable, TypeVar
+
+import manim
+from manim import logger
+
+from common.cache import atomic_write, cache_dir
+
+CACHE_DIR = cache_dir("mobjects")
+MAX_SIZE_MB = int(os.getenv("TEMPORAL_ANIMATIONS_MOBJECT_CACHE_MB", "512"))
+# The modules laying out cached mobjects, including the manim shims whose
+# classes they build.
+SOURCES = [
+    os.path.join(os.path.dirname(__file__), name)
+    for name in ["style.py", "code.py", "manim_shims.py"]
+]
+# Evict once this fraction of the size limit has been written by a process.
+EVICT_EVERY = 1 / 16
+# Evict down to this fraction of the size limit.
+EVICT_TO = 0.9
+
+T = TypeVar("T")
+
+
+def _version(sources: list[str], renderer: str) -> bytes:
+    h = hashlib.sha256(manim.__version__.encode())
+    h.update(renderer.encode())
+    for path in sources:
+        with open(path, "rb") as file:
+            h.update(hashlib.file_digest(file, "sha256").digest())
+    return h.digest()
+
+
+class MobjectCache:
+    def __init__(
+        self,
+        directory: str,
+        max_size: int,
+        sources: list[str] = SOURCES,
+        renderer: str | None = None,
+    ):
+        self.directory = directory
+        self.max_size = max_size
+        # By default the configured renderer, which the manim command line
+        # sets before importing the scene.
+        self.version = _version(sources, str(renderer or manim.config.renderer))
+        self.hits = 0
+        self.misses = 0
+        # Bytes written by this process since it last evicted.
+        self.written = 0
+
+    def get(self, key: tuple, build: Callable[[], T]) -> T:
+        """
+        Return the mobject cached for `key`, or build it with `build()` and
+        cache it.
+        """
+        if not self.max_size:
+            return build()
+        path = self.path(key)
+        try:
+            with open(path, "rb") as file:
+                mobj = pickle.load(file)
+            os.utime(path)
+            self.hits += 1
+            return mobj
+        except FileNotFoundError:
+            pass
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError) as err:
+            # Written by a version of a class that no longer unpickles.
+            logger.debug(f"Discarding mobject cache entry {path}: {err!r}")
+        self.misses += 1
+        mobj = build()
+        self.put(path, mobj)
+        return mobj
+
+    def path(self, key: tuple) -> str:
+        h = hashlib.sha256(self.version)
+        h.update(repr(key).encode())
+        digest = h.hexdigest()
+        return os.path.join(self.directory, digest[:2], f"{digest}.pickle")
+
+    def put(self, path: str, mobj: Any):
+        try:
+            data = pickle.dumps(mobj, pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError) as err:
+            logger.debug(f"Not caching {type(mobj).__name__}: {err!r}")
+            return
+        with atomic_write(path, "wb") as file:
+            file.write(data)
+        self.written += len(data)
+        if self.written >= self.max_size * EVICT_EVERY:
+            self.evict()
+
+    def evict(self):
+        """
+        Remove the least recently used entries, until the cache is within its
+        size limit. Does nothing if another process is evicting.
+        """
+        self.written = 0
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, "lock"), "w") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return
+            entries = []
+            for subdir in os.scandir(self.directory):
+                if not subdir.is_dir():
+                    continue
+                for entry in os.scandir(subdir.path):
+                    if not entry.name.endswith(".pickle"):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            size = sum(s for _, s, _ in entries)
+            if size <= self.max_size:
+                return
+            entries.sort()
+            for _, entry_size, path in entries:
+                if size <= self.max_size * EVICT_TO:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                size -= entry_size
+
+    def stats(self) -> str:
+        lookups = self.hits + self.misses
+        return f"{self.hits}/{lookups} hits, {self.misses} misses"
+
+
+mobject_cache = MobjectCache(CACHE_DIR, MAX_SIZE_MB * 2**20)
@@ -2,8 +2,10 @@
 Manim representations of Temporal entities.
 """
 from abc import ABC, abstractmethod, abstractstaticmethod
+from collections import OrderedDict
+from dataclasses import fields
 from enum import Enum
-from typing import Generic, Iterable, Self, Type, TypeVar, cast
+from typing import Any, Generic, Hashable, Iterable, Self, Type, TypeVar, cast
 
 import numpy as np
 from manim import (
@@ -13,22 +15,20 @@ from manim import (
     SMALL_BUFF,
     Animation,
     FadeOut,
-    Indicate,
     Mobject,
-    Scene,
     Text,
     VGroup,
     VMobject,
 )
 from manim.typing import Point3D, Vector3
 
-from common.utils import notnull
 from manim_renderer import style
+from manim_renderer.instrumentation import profiler
 from schema import schema
 
 E = TypeVar("E", bound=schema.Entity)
 
-from manim_renderer.manim_shims import AnimationGroup, ApplyMethod, Transform
+from manim_renderer.manim_shims import AnimationGroup, ApplyMethod, Scene, Transform
 
 SHOW_LAMPORT_TIMESTAMPS = False
 
@@ -67,15 +67,63 @@ class Root(VisualElement):
 root = Root()
 
 
+def state_key(value: Any) -> Hashable:
+    """
+    Return a hashable value that is equal for equal (parts of) entity states.
+    """
+    match value:
+        case schema.Model():
+            return (
+                type(value).__name__,
+                *(state_key(getattr(value, f.name)) for f in fields(value)),
+            )
+        case list() | tuple():
+            return tuple(map(state_key, value))
+        case set() | frozenset():
+            return frozenset(map(state_key, value))
+        case dict():
+            return tuple((k, state_key(v)) for k, v in value.items())
+        case _:
+            return value
+
+
+def children_content_state(
+    children: "list[ProxyEntity]", child_entities: list[Any]
+) -> Hashable:
+    """
+    Return the number of `child_entities`, and the content states of those
+    that already have proxies in `children`. A child without a proxy changes
+    the count.
+    """
+    return (
+        len(child_entities),
+        *(child.get_content_state(e) for child, e in zip(children, child_entities)),
+    )
+
+
 class ProxyEntity(Generic[E], VisualElement):
     """
     A VisualElement that has a counterpart entity of type E in the simulation.
     """
 
+    # The entity fields that affect the output of render(). None means that any
+    # change to the entity may affect it.
+    visual_fields: tuple[str, ...] | None = None
+    # The number of rendered mobjects retained per class, keyed by visual state.
+    render_cache_size = 32
+    _render_cache: OrderedDict[Hashable, Mobject]
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._render_cache = OrderedDict()
+
     def __init__(self, entity: E, parent: VisualElement = root) -> None:
+        self.entity_key = entity.key
         self.parent = parent
         self.dock_direction = ORIGIN
-        self.mobj = self.render(entity)  # Current visual representation
+        self.visual_state = self.get_visual_state(entity)
+        # Current visual representation
+        self.mobj = self.cached_render(entity, self.visual_state)
         proxy_entity_registry.put(entity, self)
 
     def __repr__(self) -> str:
@@ -105,7 +153,60 @@ class ProxyEntity(Generic[E], VisualElement):
         """
         Mutate `self.mobj` so that it represents the current state of `entity` and update the scene.
         """
-        self.mobj.become(self.render(entity).move_to(self.mobj))
+        visual_state = self.get_visual_state(entity)
+        if visual_state == self.visual_state:
+            return
+        self.visual_state = visual_state
+        mobj = self.cached_render(entity, visual_state)
+        with profiler.measure("become", type(self).__name__):
+            self.mobj.become(mobj.move_to(self.mobj))
+
+    def get_content_state(self, entity: E) -> Hashable:
+        """
+        Return a key that is equal for entity states that render identically,
+        both in this proxy and in any proxies positioned relative to it.
+        """
+        return self.get_visual_state(entity)
+
+    def shift(self, vector: Vector3) -> Self:
+        """
+        Shift self.mobj, together with any mobjects positioned relative to it.
+        """
+        self.mobj.shift(vector)
+        self.shift_descendants(vector)
+        return self
+
+    def shift_descendants(self, vector: Vector3):
+        """
+        Shift the mobjects positioned relative to self.mobj.
+        """
+        pass
+
+    def get_visual_state(self, entity: E) -> Hashable:
+        """
+        Return a key that is equal for entity states that render identically.
+        """
+        if self.visual_fields is None:
+            return state_key(entity)
+        visual_state = tuple(state_key(getattr(entity, f)) for f in self.visual_fields)
+        if SHOW_LAMPORT_TIMESTAMPS:
+            return (visual_state, entity.time)
+        return visual_state
+
+    def cached_render(self, entity: E, visual_state: Hashable) -> Mobject:
+        """
+        Return a copy of the mobject previously rendered for `visual_state`, if
+        any; otherwise render it.
+        """
+        cache = self._render_cache
+        if (template := cache.get(visual_state)) is not None:
+            cache.move_to_end(visual_state)
+        else:
+            with profiler.measure("render", type(self).__name__):
+                template = cache[visual_state] = self.render(entity)
+            if len(cache) > self.render_cache_size:
+                cache.popitem(last=False)
+        return template.copy()
 
     def send_message(
         self,
@@ -199,6 +300,22 @@ class ProxyEntity(Generic[E], VisualElement):
             FadeOut(message.mobj),
         )
 
+    def finish_response(
+        self,
+        receiver: "ProxyEntity",
+        message: "ProxyEntity",
+        message_entity: schema.RequestResponse,
+    ):
+        """
+        Remove a message whose response animations have been played, and the
+        pending request ray of its requester, from the scene, and forget its
+        proxy, so that finished messages cost nothing in later frames.
+        """
+        self.scene.remove(message.mobj)
+        if hasattr(receiver, "pending_request"):
+            self.scene.remove(receiver.pending_request)
+        proxy_entity_registry.remove(message_entity)
+
     def play_all_send_message_animations(
         self,
         first_halves: Iterable[Animation],
@@ -251,6 +368,10 @@ class ProxyEntityWithChildren(
     def __init__(self, entity: E, parent: VisualElement = root):
         super().__init__(entity, parent=parent)
         self.children: list[Q] = []
+        # The content state of each child when it was last rendered (None if
+        # it has not been), and the point the children were last laid out from.
+        self.child_content_states: list[Hashable] = []
+        self.children_anchor: Point3D | None = None
         for e in self.get_child_entities(entity):
             self.append_child(e)
 
@@ -258,41 +379,99 @@ class ProxyEntityWithChildren(
     def get_child_entities(entity: E) -> list[F]:  # type: ignore (bug in Pyright?)
         ...
 
+    def get_content_state(self, entity: E) -> Hashable:
+        """
+        Return the visual state of this proxy, with the content state of its
+        children. Fields that do not affect rendering, such as Lamport times,
+        are ignored, so that unchanged descendants are not re-rendered.
+        """
+        return (
+            self.get_visual_state(entity),
+            children_content_state(self.children, self.get_child_entities(entity)),
+        )
+
     def render_to_scene(self, entity: E):
+        """
+        Re-render the children whose content has changed, and lay out the
+        children from the first changed child downward. Children above it are
+        left alone. If this proxy has moved then all children are laid out.
+        """
         n = len(self.children)
         child_entities = self.get_child_entities(entity)
         for new in child_entities[n:]:
             self.append_child(new)
 
-        prev = self
-        for child, child_entity in zip(self.children, child_entities):
-            child.mobj.next_to(prev.mobj, DOWN, buff=SMALL_BUFF).align_to(
-                prev.mobj, self.child_align_direction
+        content_states = [
+            child.get_content_state(child_entity)
+            for child, child_entity in zip(self.children, child_entities)
+        ]
+        dirty = [
+            state != prev_state
+            for state, prev_state in zip(content_states, self.child_content_states)
+        ]
+        top = self.children_top()
+        anchor = top.get_corner(DOWN + self.child_align_direction)
+        if self.children_anchor is None or not np.allclose(
+            anchor, self.children_anchor
+        ):
+            first = 0
+        else:
+            first = next((i for i, d in enumerate(dirty) if d), len(dirty))
+
+        prev = top if first == 0 else self.children[first - 1].mobj
+        for child, child_entity, child_dirty in zip(
+            self.children[first:], child_entities[first:], dirty[first:]
+        ):
+            before = child.mobj.get_center()
+            child.mobj.next_to(prev, DOWN, buff=SMALL_BUFF).align_to(
+                prev, self.child_align_direction
             )
-            child.render_to_scene(child_entity)
-            prev = child
+            if child_dirty:
+                child.render_to_scene(child_entity)
+            else:
+                child.shift_descendants(child.mobj.get_center() - before)
+            prev = child.mobj
+        self.child_content_states = content_states
+        self.children_anchor = anchor
 
-        for new in self.children[n:]:
-            self.scene.play(notnull(Indicate(new.mobj)))
+        self.scene.indicate(*(new.mobj for new in self.children[n:]))
 
         super().render_to_scene(entity)
 
+    def children_top(self) -> Mobject:
+        """
+        Return the mobject below which the children are laid out.
+        """
+        return self.mobj
+
+    def shift_descendants(self, vector: Vector3):
+        for child in self.children:
+            child.shift(vector)
+        if self.children_anchor is not None:
+            self.children_anchor = self.children_anchor + vector
+
     def append_child(self, child_entity: F):
         child = self.child_cls(child_entity, parent=self)
         self.scene.add(child.mobj)
         self.children.append(child)
+        self.child_content_states.append(None)
 
 
 class ProxyEntityRegistry(Generic[E]):
     """
     A registry allowing us to look up proxies by their simulation counterparts.
+
+    The actors are fixed at scene setup time, and are also held separately, so
+    that the lookups made for the sender and receiver of every message do not
+    contend with the growing set of message proxies.
     """
 
     def __init__(self):
-        self._registry: dict[int, ProxyEntity] = {}
+        self._registry: dict[schema.EntityKey, ProxyEntity] = {}
+        self._actors: dict[schema.EntityKey, ProxyEntity] = {}
 
     def put(self, entity: E, proxy: ProxyEntity[E]) -> None:
-        key = entity.hash_key()
+        key = entity.key
         if key in self._registry:
             assert (
                 self._registry[key] == proxy
@@ -301,7 +480,20 @@ class ProxyEntityRegistry(Generic[E]):
             self._registry[key] = proxy
 
     def get(self, entity: E) -> ProxyEntity[E]:
-        return self._registry[entity.hash_key()]
+        return self._registry[entity.key]
+
+    def remove(self, entity: E) -> None:
+        del self._registry[entity.key]
+
+    def put_actors(self, *proxies: ProxyEntity) -> None:
+        for proxy in proxies:
+            self._actors[proxy.entity_key] = proxy
+
+    def get_actor(self, entity: E) -> ProxyEntity[E]:
+        try:
+            return self._actors[entity.key]
+        except KeyError:
+            raise KeyError(f"Not an actor declared by the InitEvent: {entity.key}")
 
 
 proxy_entity_registry = ProxyEntityRegistry()
@@ -1,9 +1,11 @@
-from typing import Iterable, Tuple, Type
+from typing import Callable, Iterable, Tuple, Type
 
-from manim import Animation, Scene
+from manim import Animation
 
 from manim_renderer.application import ApplicationRequest
 from manim_renderer.entity import ProxyEntity, VisualElement, proxy_entity_registry
+from manim_renderer.instrumentation import profiler
+from manim_renderer.manim_shims import Scene
 from manim_renderer.worker import (
     ActivityTaskCompleted,
     ActivityTaskRequest,
@@ -11,59 +13,130 @@ from manim_renderer.worker import (
 )
 from manim_renderer.workflow_task import WorkflowTaskRequest
 from schema import schema
+from schema.timeline import (
+    EndTick,
+    Op,
+    PlayMessages,
+    RenderState,
+    SendMessage,
+    compile_timeline,
+)
+
+# The classes of proxies displaying messages, by name. See
+# schema.timeline.message_proxy_cls.
+MESSAGE_PROXY_CLASSES: dict[str, Type[ProxyEntity]] = {
+    cls.__name__: cls
+    for cls in [
+        ApplicationRequest,
+        WorkflowTaskRequest,
+        WorkflowTaskCompleted,
+        ActivityTaskRequest,
+        ActivityTaskCompleted,
+    ]
+}
 
 
 def set_scene(scene: Scene):
     VisualElement.scene = scene
 
 
-def lamport_time(event: schema.Event) -> int:
-    match event:
-        case schema.StateChangeEvent():
-            return event.entity.time
-        case schema.MessageEvent():
-            return event.sender.time
-        case schema.InitEvent():
-            raise ValueError("Invalid event")
+def render_simulation_events(
+    events: Iterable[schema.Event],
+    lamport_skew: int | None = None,
+    from_time: int | None = None,
+    to_time: int | None = None,
+    on_tick: Callable[[int], None] | None = None,
+):
+    """
+    Render events in Lamport time order. See replay_timeline() for the
+    arguments.
+    """
+    replay_timeline(
+        compile_timeline(profiler.decode(events), lamport_skew),
+        from_time,
+        to_time,
+        on_tick,
+    )
 
 
-def render_simulation_events(events: Iterable[schema.Event]):
+def replay_timeline(
+    ops: Iterable[Op],
+    from_time: int | None = None,
+    to_time: int | None = None,
+    on_tick: Callable[[int], None] | None = None,
+):
+    """
+    Render the operations of a timeline. Events with Lamport time before
+    `from_time` are fast-forwarded: their effects on the scene are applied, but
+    no frames are rendered. Rendering stops at the first event with Lamport
+    time `to_time` or later. `on_tick` is called with each Lamport time once
+    all of its events have been rendered.
+    """
+    scene = VisualElement.scene
+    if from_time is not None:
+        scene.fast_forward = True
     animations: list[Iterable[Animation | None]] = []
+    # The messages whose response stage is animated by `animations`, to be
+    # removed once those have been played.
+    responses: list[
+        tuple[ProxyEntity, ProxyEntity, ProxyEntity, schema.RequestResponse]
+    ] = []
 
     def flush_animations():
         if animations:
-            sender.play_all_send_message_animations(*zip(*animations))
+            with profiler.attribute("MessageEvent"):
+                sender.play_all_send_message_animations(*zip(*animations))
             animations.clear()
+        for responder, requester_proxy, message_proxy, message_entity in responses:
+            responder.finish_response(requester_proxy, message_proxy, message_entity)
+        responses.clear()
+
+    def end_tick(tick: int):
+        flush_animations()
+        with profiler.attribute("StateChangeEvent"):
+            scene.flush_indications()
+        if tick >= 0:
+            profiler.tick(tick, scene)
+            if on_tick:
+                on_tick(tick)
 
-    serial = False
     curr_time = -1
-    for event in sorted(events, key=lamport_time):
-        match event:
-            case schema.StateChangeEvent():
-                if event.entity.time > curr_time:
-                    flush_animations()
-                    curr_time = event.entity.time
-
-                proxy_entity = proxy_entity_registry.get(event.entity)
-                proxy_entity.render_to_scene(event.entity)
-            case schema.MessageEvent():
-                (sender, message, receiver) = _get_proxy_entities(
-                    event.sender, event.message, event.receiver
-                )
-
-                if serial or event.message.time > curr_time:
-                    flush_animations()
-                    curr_time = event.message.time
-
-                animations.append(sender.send_message(receiver, message, event.message))
-
-    flush_animations()
+    for op in ops:
+        if to_time is not None and op.time >= to_time:
+            end_tick(curr_time)
+            break
+        if from_time is not None and scene.fast_forward and op.time >= from_time:
+            flush_animations()
+            scene.fast_forward = False
+
+        match op:
+            case RenderState(entity=entity):
+                with profiler.attribute("StateChangeEvent"):
+                    with profiler.measure("lookup"):
+                        proxy_entity = proxy_entity_registry.get(entity)
+                    proxy_class = type(proxy_entity).__name__
+                    with profiler.measure("render_to_scene", proxy_class):
+                        proxy_entity.render_to_scene(entity)
+                curr_time = op.time
+            case SendMessage():
+                with profiler.attribute("MessageEvent"):
+                    with profiler.measure("lookup"):
+                        (sender, message, receiver) = _get_proxy_entities(op)
+                    with profiler.measure("send_message", type(message).__name__):
+                        animations.append(
+                            sender.send_message(receiver, message, op.message)
+                        )
+                if op.message.stage == schema.RequestResponseStage.Response:
+                    responses.append((sender, receiver, message, op.message))
+                curr_time = op.time
+            case PlayMessages():
+                flush_animations()
+            case EndTick(tick=tick):
+                end_tick(tick)
 
 
 def _get_proxy_entities(
-    sender_entity: schema.Entity,
-    message_entity: schema.RequestResponse,
-    receiver_entity: schema.Entity,
+    op: SendMessage,
 ) -> Tuple[ProxyEntity, ProxyEntity[schema.RequestResponse], ProxyEntity]:
     """
     Obtain renderer proxies for the simulation entities. The two
@@ -73,36 +146,16 @@ def _get_proxy_entities(
     already (it's the response stage).
     """
     sender, receiver = (
-        proxy_entity_registry.get(sender_entity),
-        proxy_entity_registry.get(receiver_entity),
+        proxy_entity_registry.get_actor(op.sender),
+        proxy_entity_registry.get_actor(op.receiver),
     )
     try:
-        msg = proxy_entity_registry.get(message_entity)
-        msg.render_to_scene(message_entity)
+        msg = proxy_entity_registry.get(op.message)
+        msg.render_to_scene(op.message)
     except KeyError:
-        msg_cls = _get_message_cls_for(sender_entity, message_entity)
-        msg = msg_cls(entity=message_entity)
-        msg.mobj.move_to(sender.get_message_start(message_entity))
-        proxy_entity_registry.put(message_entity, msg)
+        if op.proxy_cls is None:
+            raise ValueError(f"Response to an unknown message: {op.message.key}")
+        msg = MESSAGE_PROXY_CLASSES[op.proxy_cls](entity=op.message)
+        msg.mobj.move_to(sender.get_message_start(op.message))
+        proxy_entity_registry.put(op.message, msg)
     return sender, msg, receiver
-
-
-def _get_message_cls_for(
-    sender_entity: schema.Entity,
-    message_entity: schema.RequestResponse,
-) -> Type[ProxyEntity]:
-    match message_entity, sender_entity:
-        case (schema.ApplicationRequest(), _):
-            return ApplicationRequest
-        case (schema.WorkerPollRequest(), schema.WorkflowWorker()):
-            return WorkflowTaskRequest
-        case (schema.WorkerRequest(), schema.WorkflowWorker()):
-            return WorkflowTaskCompleted
-        case (schema.WorkerPollRequest(), schema.ActivityWorker()):
-            return ActivityTaskRequest
-        case (schema.WorkerRequest(), schema.ActivityWorker()):
-            return ActivityTaskCompleted
-        case _:
-            raise ValueError(
-                f"Unsupported (message, sender) types: {(type(message_entity).__name__, type(sender_entity).__name__)}"
-            )
@@ -0,0 +1,315 @@
+"""
+Render all scenes, and the side-by-side composites made from them.
+
+Jobs run as subprocesses, as many at a time as there are CPU cores and memory
+for. A composite is rendered as a single scene from the events of two scenes,
+so its job waits for those scenes to have been simulated. Results are cached
+by content: a video is re-rendered only if its events, the renderer code or
+the quality have changed (see common/cache.py).
+
+Usage:
+
+    python -m manim_renderer.farm [-j JOBS] [-q QUALITY] [SCENE ...]
+"""
+import argparse
+import glob
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable
+
+from common.cache import atomic_write, cache_dir
+
+SCENES_DIR = "scenes"
+VIDEOS_DIR = "scenes/videos"
+MEDIA_DIR = "scenes/media"
+CACHE_DIR = cache_dir("videos")
+# Source files whose content determines the rendering of an event file.
+RENDERER_SOURCES = ["manim_renderer/*.py", "schema/*.py", "common/*.py"]
+# Peak resident memory of a manim render at high quality, with some headroom.
+MEMORY_PER_JOB = 2 * 1024**3
+# Movie subdirectories written by manim for each quality flag.
+QUALITY_DIRS = {
+    "l": "480p15",
+    "m": "720p30",
+    "h": "1080p60",
+    "p": "1440p60",
+    "k": "2160p60",
+}
+# Command-line flags selecting each manim renderer. The OpenGL renderer writes a
+# movie only if asked to, to the same path as the Cairo renderer. It is
+# experimental: bin/check-renderers has not yet passed with it.
+RENDERER_FLAGS = {
+    "cairo": [],
+    "opengl": ["--renderer", "opengl", "--write_to_movie"],
+}
+# (left, right, output)
+COMPOSITES = [
+    ("Signal", "SignalWithStart", "HeadToHeadSignalWithStart"),
+    (
+        "ExecuteUpdate",
+        "StartWorkflowAndExecuteUpdate",
+        "HeadToHeadStartWorkflowAndExecuteUpdate",
+    ),
+]
+
+
+@dataclass
+class Job:
+    name: str
+    output: str
+    # Return the cache key of the output. Called once the dependencies are done.
+    get_key: Callable[[], str]
+    # Create the output.
+    run: Callable[[], None]
+    deps: list["Job"] = field(default_factory=list)
+    key: str | None = None
+
+
+def scene_job(scene: str, quality: str) -> Job:
+    events_file = events_path(scene)
+
+    def get_key() -> str:
+        os.makedirs(os.path.dirname(events_file), exist_ok=True)
+        with open(events_file, "w") as file:
+            subprocess.run(
+                [sys.executable, os.path.join(SCENES_DIR, f"{scene}.py")],
+                stdout=file,
+                check=True,
+            )
+        return content_hash(quality, events_file, *renderer_sources())
+
+    def run():
+        render(scene, quality, {"TEMPORAL_ANIMATIONS_EVENTS_FILE": events_file})
+
+    return Job(scene, video_path(scene), get_key, run)
+
+
+def composite_job(left: Job, right: Job, name: str, quality: str) -> Job:
+    """
+    Render the scenes of `left` and `right` side by side, in a single scene,
+    from the events simulated by those jobs.
+    """
+    events_files = [events_path(left.name), events_path(right.name)]
+
+    def get_key() -> str:
+        return content_hash(quality, *events_files, *renderer_sources())
+
+    def run():
+        render(
+            name,
+            quality,
+            {"TEMPORAL_ANIMATIONS_EVENTS_FILES": os.pathsep.join(events_files)},
+        )
+
+    return Job(name, video_path(name), get_key, run, deps=[left, right])
+
+
+def render(
+    name: str,
+    quality: str,
+    env: dict[str, str],
+    output: str | None = None,
+    renderer: str = "cairo",
+):
+    """
+    Render TemporalScene, configured by `env`, with `renderer`, to `output` (by
+    default the video for `name`).
+    """
+    media_dir = os.path.join(MEDIA_DIR, name)
+    command = [
+        sys.executable,
+        "-m",
+        "manim",
+        *RENDERER_FLAGS[renderer],
+        f"-q{quality}",
+        "-o",
+        name,
+        "--media_dir",
+        media_dir,
+        "manim_renderer/scene.py",
+        "TemporalScene",
+    ]
+    if renderer == "opengl":
+        command, env = headless(command, env)
+    subprocess.run(
+        command,
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        check=True,
+    )
+    movie_dir = os.path.join(media_dir, "videos", "scene", QUALITY_DIRS[quality])
+    shutil.move(os.path.join(movie_dir, f"{name}.mp4"), output or video_path(name))
+
+
+def headless(
+    command: list[str], env: dict[str, str]
+) -> tuple[list[str], dict[str, str]]:
+    """
+    Return `command` and `env` adapted to run an OpenGL render on the CPU, with
+    Mesa's software rasterizer, and in a virtual X display if there is no
+    display.
+    """
+    env = {"LIBGL_ALWAYS_SOFTWARE": "1", **env}
+    if not os.getenv("DISPLAY") and shutil.which("xvfb-run"):
+        command = ["xvfb-run", "-a", *command]
+    return command, env
+
+
+def events_path(scene: str) -> str:
+    return os.path.join(MEDIA_DIR, scene, "events.jsonl")
+
+
+def video_path(name: str) -> str:
+    return os.path.join(VIDEOS_DIR, f"{name}.mp4")
+
+
+def renderer_sources() -> list[str]:
+    return sorted(path for pattern in RENDERER_SOURCES for path in glob.glob(pattern))
+
+
+def content_hash(*parts: str) -> str:
+    """
+    Hash strings and, for those that are paths of existing files, their
+    contents.
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode())
+        if os.path.isfile(part):
+            with open(part, "rb") as file:
+                h.update(hashlib.file_digest(file, "sha256").digest())
+    return h.hexdigest()
+
+
+def cache_path(key: str) -> str:
+    return os.path.join(CACHE_DIR, key[:2], f"{key}.mp4")
+
+
+def default_jobs() -> int:
+    """
+    Return the number of renders that the machine's CPU cores and memory can
+    sustain at once.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    return max(1, min(cpus, available_memory() // MEMORY_PER_JOB))
+
+
+def available_memory() -> int:
+    try:
+        with open("/proc/meminfo") as file:
+            for line in file:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except FileNotFoundError:
+        pass
+    return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+
+
+def run_job(job: Job) -> bool:
+    """
+    Create the output of `job`, from the cache if possible. Return whether it
+    was a cache hit.
+    """
+    job.key = job.get_key()
+    cached = cache_path(job.key)
+    os.makedirs(os.path.dirname(job.output), exist_ok=True)
+    if os.path.exists(cached):
+        shutil.copyfile(cached, job.output)
+        return True
+    job.run()
+    with atomic_write(cached, "wb") as file, open(job.output, "rb") as output:
+        shutil.copyfileobj(output, file)
+    return False
+
+
+def run_farm(jobs: list[Job], n_workers: int) -> bool:
+    """
+    Run `jobs`, each once its dependencies have succeeded. Return whether all
+    jobs succeeded.
+    """
+    pending = list(jobs)
+    running: dict[Future[bool], tuple[Job, float]] = {}
+    done: set[str] = set()
+    failed: set[str] = set()
+    start = time.monotonic()
+
+    def report(job: Job, status: str, seconds: float):
+        n = len(done) + len(failed)
+        print(f"[{n}/{len(jobs)}] {job.name}: {status} ({seconds:.1f}s)", flush=True)
+
+    with ThreadPoolExecutor(n_workers) as pool:
+        while pending or running:
+            for job in list(pending):
+                if any(d.name in failed for d in job.deps):
+                    pending.remove(job)
+                    failed.add(job.name)
+                    report(job, "skipped: a dependency failed", 0)
+                elif all(d.name in done for d in job.deps):
+                    pending.remove(job)
+                    running[pool.submit(run_job, job)] = (job, time.monotonic())
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                job, job_start = running.pop(future)
+                seconds = time.monotonic() - job_start
+                try:
+                    hit = future.result()
+                except subprocess.CalledProcessError as err:
+                    failed.add(job.name)
+                    report(job, "failed", seconds)
+                    if err.stderr:
+                        sys.stdout.write(err.stderr.decode(errors="replace"))
+                except Exception as err:
+                    # E.g. the movie is not where it was expected, or the cache
+                    # cannot be written. Dependents are skipped, other jobs run.
+                    failed.add(job.name)
+                    report(job, "failed", seconds)
+                    traceback.print_exception(err, file=sys.stdout)
+                else:
+                    done.add(job.name)
+                    report(job, "cached" if hit else "rendered", seconds)
+
+    print(
+        f"{len(done)} succeeded, {len(failed)} failed "
+        f"in {time.monotonic() - start:.1f}s with {n_workers} workers"
+    )
+    return not failed
+
+
+def main():
+    all_scenes = sorted(
+        os.path.splitext(os.path.basename(path))[0]
+        for path in glob.glob(os.path.join(SCENES_DIR, "*.py"))
+    )
+    parser = argparse.ArgumentParser(description="Render all scenes.")
+    parser.add_argument("scenes", nargs="*", help="default: all scenes")
+    parser.add_argument("-j", "--jobs", type=int, default=default_jobs())
+    parser.add_argument("-q", "--quality", choices=list(QUALITY_DIRS), default="h")
+    args = parser.parse_args()
+    if unknown := set(args.scenes) - set(all_scenes):
+        parser.error(f"Unknown scenes: {', '.join(sorted(unknown))}")
+
+    scene_jobs = {
+        scene: scene_job(scene, args.quality) for scene in args.scenes or all_scenes
+    }
+    jobs = list(scene_jobs.values())
+    for left, right, name in COMPOSITES:
+        if left in scene_jobs and right in scene_jobs:
+            jobs.append(
+                composite_job(scene_jobs[left], scene_jobs[right], name, args.quality)
+            )
+    sys.exit(0 if run_farm(jobs, args.jobs) else 1)
+
+
+if __name__ == "__main__":
+    main()
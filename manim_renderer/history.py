@@ -1,22 +1,31 @@
-from typing import Iterable
+from typing import Hashable, Iterable
 
-from manim import DOWN
-from manim import GREEN_D as GREEN
-from manim import LEFT
-from manim import RED_D as RED
-from manim import SMALL_BUFF, Mobject, SurroundingRectangle, VGroup
+from manim.typing import Vector3
+from manim import DOWN, LEFT, SMALL_BUFF, Mobject, SurroundingRectangle, VGroup
 
 from manim_renderer import style
-from manim_renderer.entity import ProxyEntity, ProxyEntityWithChildren, VisualElement
+from manim_renderer.entity import (
+    ProxyEntity,
+    ProxyEntityWithChildren,
+    VisualElement,
+    children_content_state,
+    proxy_entity_registry,
+)
 from schema import schema
 
 
 class HistoryEvent(ProxyEntity[schema.HistoryEvent]):
+    visual_fields = ("event_type", "seen_by_worker")
+
     @staticmethod
     def render(event: schema.HistoryEvent) -> Mobject:
         return style.history_event(
             event.event_type.name,
-            color=GREEN if event.seen_by_worker else RED,
+            color=(
+                style.COLOR_SEEN_HISTORY_EVENT
+                if event.seen_by_worker
+                else style.COLOR_UNSEEN_HISTORY_EVENT
+            ),
         )
 
 
@@ -31,49 +40,167 @@ class HistoryEvents(VisualElement):
 class History(
     ProxyEntityWithChildren[schema.History, schema.HistoryEvent, HistoryEvent]
 ):
+    """
+    The events of a workflow history, with each completed WFT group surrounded
+    by a rectangle.
+
+    Only the latest events are displayed (see first_displayed_event()), below
+    a line summarizing the earlier ones, which are evicted from the scene and
+    the proxy registry as the history grows. The cost of rendering a history
+    therefore does not grow with its length.
+    """
+
     child_cls = HistoryEvent
     child_align_direction = LEFT
+    visual_fields = ()
+    # The number of latest events displayed, not counting the earlier events of
+    # a WFT group that the first of them belongs to.
+    max_events = 16
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.history_event_group_mobjs: list[Mobject] = []
+    def __init__(self, entity: schema.History, *args, **kwargs):
+        super().__init__(entity, *args, **kwargs)
+        # The index in the history of the event displayed by the first child.
+        self.first_event = self.first_displayed_event(entity.events)
+        self.summary: Mobject | None = None
+        self.n_summarized_events = 0
+        # The rectangle of each displayed WFT group, with the index of its
+        # first event.
+        self.history_event_groups: list[tuple[int, Mobject]] = []
+        # Group boundaries are tracked incrementally: the number of events
+        # scanned so far, and the first index and the events of the WFT group
+        # that is still open.
+        self.n_grouped_events = self.first_event
+        self.open_history_event_group_start = 0
+        self.open_history_event_group: list[Mobject] = []
 
     @staticmethod
     def render(_: schema.History) -> Mobject:
         return style.invisible_point()
 
+    @classmethod
+    def first_displayed_event(cls, events: list[schema.HistoryEvent]) -> int:
+        """
+        Return the index of the first event displayed: the first of the last
+        `max_events` events, or the start of the WFT group it belongs to.
+        Groups, and in particular the open group, are therefore never cut.
+        """
+        first = max(0, len(events) - cls.max_events)
+        for i in range(first - 1, -1, -1):
+            match events[i].event_type:
+                case schema.HistoryEventType.WFT_SCHEDULED:
+                    return i
+                case schema.HistoryEventType.WFT_COMPLETED:
+                    return first
+        return first
+
+    def get_content_state(self, entity: schema.History) -> Hashable:
+        first = self.first_displayed_event(entity.events)
+        # Children of events that are about to be evicted are skipped.
+        children = self.children[max(0, first - self.first_event) :]
+        return (first, children_content_state(children, entity.events[first:]))
+
+    def children_top(self) -> Mobject:
+        return self.summary if self.summary is not None else self.mobj
+
+    def shift_descendants(self, vector: Vector3):
+        super().shift_descendants(vector)
+        for _, rect in self.history_event_groups:
+            rect.shift(vector)
+        if self.summary is not None:
+            self.summary.shift(vector)
+
     def render_to_scene(self, entity: schema.History):
+        first = self.first_displayed_event(entity.events)
+        # Rectangles follow the first child that remains displayed.
+        n_evicted = first - self.first_event
+        reference = (
+            self.children[n_evicted].mobj.get_center()
+            if n_evicted < len(self.children)
+            else None
+        )
+        self.evict_events(entity.events, first)
+        self.summary_render_to_scene()
         super().render_to_scene(entity)
+        if reference is not None and self.children:
+            shift = self.children[0].mobj.get_center() - reference
+            for _, rect in self.history_event_groups:
+                rect.shift(shift)
         self.history_event_groups_render_to_scene(entity)
 
+    def evict_events(self, events: list[schema.HistoryEvent], first: int):
+        """
+        Remove the children displaying the events before index `first`, and
+        the rectangles of their groups, from the scene and the proxy registry.
+        """
+        if first == self.first_event:
+            return
+        n_evicted = first - self.first_event
+        for child, event in zip(self.children[:n_evicted], events[self.first_event :]):
+            self.scene.remove(child.mobj)
+            proxy_entity_registry.remove(event)
+        del self.children[:n_evicted]
+        del self.child_content_states[:n_evicted]
+        # Lay out all remaining children, which move up.
+        self.children_anchor = None
+        while self.history_event_groups and self.history_event_groups[0][0] < first:
+            self.scene.remove(self.history_event_groups.pop(0)[1])
+        if self.open_history_event_group_start < first:
+            self.open_history_event_group.clear()
+        self.first_event = first
+
+    def summary_render_to_scene(self):
+        """
+        Display the number of events that are not displayed, above the others.
+        """
+        if self.n_summarized_events != self.first_event:
+            if self.summary is not None:
+                self.scene.remove(self.summary)
+            self.summary = None
+            if self.first_event:
+                self.summary = style.history_summary(self.first_event)
+                self.scene.add(self.summary)
+            self.n_summarized_events = self.first_event
+        if self.summary is not None:
+            self.summary.next_to(self.mobj, DOWN, buff=SMALL_BUFF).align_to(
+                self.mobj, LEFT
+            )
+
     def history_event_groups_render_to_scene(self, entity: schema.History):
+        """
+        Surround each completed WFT group with a rectangle. History is
+        append-only, so only the events appended since the last call are
+        scanned, and only the rectangles of groups that they complete are
+        created.
+        """
         child_entities = self.get_child_entities(entity)
         assert len(self.children) == len(child_entities)
-        wfts: list[list[Mobject]] = []
-        wft: list[Mobject] = []
-        for c, e in zip(self.children, child_entities):
+
+        n = max(self.n_grouped_events, self.first_event)
+        wft = self.open_history_event_group
+        for i, e in enumerate(entity.events[n:], n):
+            c = self.children[i - self.first_event]
             if e.event_type == schema.HistoryEventType.WFT_SCHEDULED:
                 assert not wft
                 wft.append(c.mobj)
+                self.open_history_event_group_start = i
             elif e.event_type == schema.HistoryEventType.WFT_COMPLETED:
                 wft.append(c.mobj)
-                wfts.append(wft)
-                wft = []
+                rect = SurroundingRectangle(
+                    VGroup(*wft),
+                    color=style.COLOR_HISTORY_EVENT_GROUP_RECT,
+                    stroke_width=style.STROKE_WIDTH_HISTORY_EVENT_GROUP_RECT,
+                    buff=0.05,
+                    corner_radius=0,
+                )
+                self.scene.add(rect)
+                self.history_event_groups.append(
+                    (self.open_history_event_group_start, rect)
+                )
+                wft.clear()
             elif wft:
                 wft.append(c.mobj)
-        self.scene.remove(*self.history_event_group_mobjs)
-        self.history_event_group_mobjs = [
-            SurroundingRectangle(
-                VGroup(*wft),
-                color=style.COLOR_HISTORY_EVENT_GROUP_RECT,
-                stroke_width=style.STROKE_WIDTH_HISTORY_EVENT_GROUP_RECT,
-                buff=0.05,
-                corner_radius=0,
-            )
-            for wft in wfts
-        ]
-        self.scene.add(*self.history_event_group_mobjs)
+        self.n_grouped_events = len(entity.events)
 
-    @staticmethod
-    def get_child_entities(entity: schema.History) -> list[schema.HistoryEvent]:
-        return entity.events
+    @classmethod
+    def get_child_entities(cls, entity: schema.History) -> list[schema.HistoryEvent]:
+        return entity.events[cls.first_displayed_event(entity.events) :]
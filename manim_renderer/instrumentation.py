@@ -0,0 +1,169 @@
+"""
+Measure where the time of a render goes.
+
+Set TEMPORAL_ANIMATIONS_PROFILE to enable: to a file path to write the report
+there, or to 1 to log it. The time of each phase of processing an event
+(decoding it, looking up its proxies, rendering it to the scene, playing
+animations) is recorded against the event type and the proxy class involved,
+and the number of mobjects in the scene is recorded after each Lamport tick,
+so that a mobject leak shows up as a count that keeps growing.
+"""
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import Any, ContextManager, Iterable, Iterator
+
+from manim import logger
+
+PROFILE = os.getenv("TEMPORAL_ANIMATIONS_PROFILE")
+
+
+@dataclass
+class Stat:
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+
+@dataclass
+class TickCount:
+    time: int
+    mobjects: int
+    submobjects: int
+
+
+class Profiler:
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        # (phase, event type, proxy class) -> Stat
+        self.stats: dict[tuple[str, str, str], Stat] = {}
+        self.ticks: list[TickCount] = []
+        # The event type and proxy class that time is currently attributed to.
+        self.context = ("", "")
+        # For each measurement in progress, innermost last, the time spent in
+        # measurements nested in it.
+        self.nested: list[float] = []
+
+    def record(self, phase: str, seconds: float, proxy_class: str | None = None):
+        event_type, context_class = self.context
+        key = (phase, event_type, proxy_class or context_class)
+        if (stat := self.stats.get(key)) is None:
+            stat = self.stats[key] = Stat()
+        stat.add(seconds)
+
+    def measure(self, phase: str, proxy_class: str | None = None) -> ContextManager:
+        """
+        Return a context manager recording the time spent in it against
+        `phase`, the current event type, and `proxy_class` (by default the
+        current proxy class). Time spent in nested measurements is recorded
+        against their phases only, so that phases add up to the total.
+        """
+        if not self.enabled:
+            return nullcontext()
+        return self._measure(phase, proxy_class)
+
+    @contextmanager
+    def _measure(self, phase: str, proxy_class: str | None):
+        self.nested.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self.record(phase, seconds - self.nested.pop(), proxy_class)
+            self.add_nested(seconds)
+
+    def add_nested(self, seconds: float):
+        if self.nested:
+            self.nested[-1] += seconds
+
+    def attribute(self, event_type: str, proxy_class: str = "") -> ContextManager:
+        """
+        Return a context manager attributing time spent in it to `event_type`
+        and `proxy_class`.
+        """
+        if not self.enabled:
+            return nullcontext()
+        return self._attribute(event_type, proxy_class)
+
+    @contextmanager
+    def _attribute(self, event_type: str, proxy_class: str):
+        context, self.context = self.context, (event_type, proxy_class)
+        try:
+            yield
+        finally:
+            self.context = context
+
+    def decode(self, events: Iterable[Any]) -> Iterator[Any]:
+        """
+        Yield `events`, recording the time taken to produce each one.
+        """
+        if not self.enabled:
+            yield from events
+            return
+        it = iter(events)
+        while True:
+            start = time.perf_counter()
+            try:
+                event = next(it)
+            except StopIteration:
+                return
+            seconds = time.perf_counter() - start
+            with self.attribute(type(event).__name__):
+                self.record("decode", seconds)
+            self.add_nested(seconds)
+            yield event
+
+    def tick(self, lamport_time: int, scene: Any):
+        if self.enabled:
+            self.ticks.append(
+                TickCount(
+                    lamport_time,
+                    len(scene.mobjects),
+                    sum(len(m.get_family()) for m in scene.mobjects),
+                )
+            )
+
+    def report(self) -> str:
+        """
+        Return a table of the self time of each phase, excluding the time of
+        the phases nested in it, so that the rows add up to the total.
+        """
+        rows = sorted(self.stats.items(), key=lambda item: -item[1].total)
+        total = sum(stat.total for stat in self.stats.values())
+        lines = [
+            f"{'phase':16} {'event type':20} {'proxy class':24} {'count':>7} "
+            f"{'self ms':>10} {'%':>6} {'mean ms':>9} {'max ms':>9}"
+        ]
+        for (phase, event_type, proxy_class), stat in rows:
+            lines.append(
+                f"{phase:16} {event_type:20} {proxy_class:24} {stat.count:7d} "
+                f"{stat.total * 1000:10.1f} {100 * stat.total / (total or 1):6.1f} "
+                f"{stat.total * 1000 / stat.count:9.2f} {stat.max * 1000:9.2f}"
+            )
+        lines.append(f"{'total':70} {total * 1000:10.1f}")
+        if self.ticks:
+            lines += ["", f"{'lamport time':>12} {'mobjects':>9} {'submobjects':>12}"]
+            lines += [
+                f"{t.time:12d} {t.mobjects:9d} {t.submobjects:12d}" for t in self.ticks
+            ]
+        return "\n".join(lines)
+
+    def write_report(self):
+        if not self.enabled:
+            return
+        if PROFILE == "1":
+            logger.info("Render profile:\n" + self.report())
+        else:
+            with open(str(PROFILE), "w") as file:
+                print(self.report(), file=file)
+            logger.info(f"Wrote render profile to {PROFILE}")
+
+
+profiler = Profiler(enabled=bool(PROFILE))
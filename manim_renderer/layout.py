@@ -0,0 +1,121 @@
+"""
+Automatic placement of the actors of a scene.
+
+The clients of the Temporal server (applications and workers) are stacked down
+the left of the frame, starting a new column when a column is full, and dock
+messages on their right. The server is on the right, aligned with the first
+workflow worker and docking messages on its top, with a Nexus server, if any,
+above it. Placement depends only on the types and sizes of the actors, and on
+the region of the frame, so layouts are cached by those.
+
+For scenes with one application, one workflow worker and at most one activity
+worker, this reproduces the hand-written placement that it replaced. Scenes
+with a Nexus server (NexusRequest) are laid out differently: the Nexus worker
+is stacked below the application like any other client, and the server, with
+the Nexus server above it, moves down to stay aligned with the workflow
+worker.
+"""
+import numpy as np
+from manim import DL, LEFT, MED_SMALL_BUFF, RIGHT, SMALL_BUFF, UL, UP, config
+from manim.typing import Point3D, Vector3
+
+from manim_renderer.entity import ProxyEntity, ProxyEntityWithChildren
+
+# Client types, in the order in which they are stacked.
+CLIENT_TYPES = ["Application", "NexusWorker", "WorkflowWorker", "ActivityWorker"]
+# Space below a client, in addition to MED_SMALL_BUFF.
+CLIENT_EXTRA_BUFF = {"Application": 0.2, "WorkflowWorker": 0.5}
+BUFF_TOP = 0.25
+BUFF_COLUMN = 0.5
+# Distance from the right edge of the server to the right edge of the frame.
+SERVER_RIGHT_BUFF = 2.0
+
+# (type, width, height) of each actor
+type Signature = tuple[tuple[str, float, float], ...]
+# Left and right x coordinates of a region of the frame
+type Region = tuple[float, float]
+# Upper left corner and dock direction
+type Placement = tuple[Point3D, Vector3]
+
+_layouts: dict[tuple[Signature, Region], list[Placement]] = {}
+
+
+def full_frame() -> Region:
+    return (-config.frame_width / 2, config.frame_width / 2)
+
+
+def layout_actors(actors: list[ProxyEntity], region: Region | None = None):
+    """
+    Move `actors`, with their children, to non-overlapping positions within
+    `region` (by default the whole frame), and set their dock directions.
+    """
+    region = region or full_frame()
+    key = (get_signature(actors), region)
+    if (placements := _layouts.get(key)) is None:
+        placements = _layouts[key] = compute_layout(*key)
+    for actor, (corner, dock_direction) in zip(actors, placements):
+        actor.set_dock_direction(dock_direction)
+        actor.shift(corner - actor.mobj.get_corner(UL))
+
+
+def get_signature(actors: list[ProxyEntity]) -> Signature:
+    return tuple(
+        (type(actor).__name__, *(round(x, 3) for x in get_size(actor)))
+        for actor in actors
+    )
+
+
+def get_size(actor: ProxyEntity) -> tuple[float, float]:
+    """
+    Return the size of the actor once its children are laid out below it.
+    """
+    width, height = actor.mobj.width, actor.mobj.height
+    if isinstance(actor, ProxyEntityWithChildren):
+        for child in actor.children:
+            width = max(width, child.mobj.width)
+            height += SMALL_BUFF + child.mobj.height
+    return width, height
+
+
+def compute_layout(signature: Signature, region: Region) -> list[Placement]:
+    left, right = region
+    top = config.frame_height / 2 - BUFF_TOP
+    bottom = -config.frame_height / 2
+    x, y = left + SMALL_BUFF, top
+    column_width = 0.0
+    placements: dict[int, Placement] = {}
+
+    clients = sorted(
+        (i for i, (type_name, *_) in enumerate(signature) if type_name in CLIENT_TYPES),
+        key=lambda i: CLIENT_TYPES.index(signature[i][0]),
+    )
+    for i in clients:
+        type_name, width, height = signature[i]
+        if y - height < bottom and y < top:
+            x, y = x + column_width + BUFF_COLUMN, top
+            column_width = 0.0
+        placements[i] = (np.array([x, y, 0.0]), RIGHT)
+        y -= height + MED_SMALL_BUFF + CLIENT_EXTRA_BUFF.get(type_name, 0)
+        column_width = max(column_width, width)
+
+    workflow_worker_tops = [
+        placements[i][0][1] for i in clients if signature[i][0] == "WorkflowWorker"
+    ]
+    server_corner = np.array(
+        [
+            right - SERVER_RIGHT_BUFF,
+            workflow_worker_tops[0] if workflow_worker_tops else top,
+            0.0,
+        ]
+    )
+    for i, (type_name, width, _) in enumerate(signature):
+        if type_name == "Server":
+            server_corner = server_corner + width * LEFT
+            placements[i] = (server_corner, UP)
+    for i, (type_name, _, height) in enumerate(signature):
+        if type_name == "NexusServer":
+            placements[i] = (server_corner + (MED_SMALL_BUFF + height) * UP, DL)
+        elif i not in placements:
+            raise ValueError(f"Cannot lay out actor of type {type_name}")
+
+    return [placements[i] for i in range(len(signature))]
@@ -2,6 +2,7 @@ from typing import Self, cast
 
 import manim
 
+from manim_renderer.instrumentation import profiler
 from manim_renderer.style import COLOR_SCENE_BACKGROUND
 
 
@@ -24,6 +25,66 @@ class Transform(_NotNone, manim.Transform):
     pass
 
 
+class Scene(manim.Scene):
+    """
+    A Scene that can fast-forward: while `fast_forward` is set, animations are
+    applied instantly, leaving mobjects in the state in which playing them
+    would have left them, and no frames are rendered.
+
+    The run time of animations and the duration of waits are multiplied by
+    `run_time_scale` and `wait_scale` respectively (see timing.py). Indicate
+    animations requested by indicate() are queued, and played together.
+    """
+
+    fast_forward = False
+    run_time_scale = 1.0
+    wait_scale = 1.0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pending_indications: list[manim.Mobject] = []
+
+    def play(self, *args, **kwargs):
+        self.flush_indications()
+        with profiler.measure("play"):
+            self._play(*args, **kwargs)
+
+    def _play(self, *args, **kwargs):
+        if not self.fast_forward:
+            if self.run_time_scale != 1:
+                animations = self.compile_animations(*args, **kwargs)
+                for animation in animations:
+                    animation.run_time *= self.run_time_scale
+                args, kwargs = tuple(animations), {}
+            return super().play(*args, **kwargs)
+        animations = self.compile_animations(*args, **kwargs)
+        self.add_mobjects_from_animations(animations)
+        for animation in animations:
+            animation._setup_scene(self)
+            animation.begin()
+            animation.finish()
+            animation.clean_up_from_scene(self)
+
+    def wait(self, duration: float = manim.DEFAULT_WAIT_TIME, *args, **kwargs):
+        self.flush_indications()
+        if not self.fast_forward and duration * self.wait_scale > 0:
+            with profiler.measure("wait"):
+                return super().wait(duration * self.wait_scale, *args, **kwargs)
+
+    def indicate(self, *mobjects: manim.Mobject):
+        """
+        Queue Indicate animations of `mobjects`, to be played together, before
+        the next animation or wait.
+        """
+        if not self.fast_forward:
+            self.pending_indications.extend(mobjects)
+
+    def flush_indications(self):
+        if mobjects := self.pending_indications:
+            self.pending_indications = []
+            self.play(*(manim.Indicate(m) for m in mobjects))
+
+
 class Code(manim.Code):
     # Code doesn't make it easy to set background color.
     @property
@@ -6,10 +6,14 @@ from schema import schema
 
 
 class NexusServer(ProxyEntity[schema.NexusServer]):
+    visual_fields = ()
+
     def render(self, _: schema.NexusServer) -> Mobject:
         return style.actor("Nexus Server")
 
 
 class NexusWorker(ProxyEntity[schema.NexusWorker]):
+    visual_fields = ()
+
     def render(self, _: schema.NexusWorker) -> Mobject:
         return style.actor("Nexus Worker")
@@ -0,0 +1,152 @@
+"""
+Render one scene across several CPU cores.
+
+The scene is split into segments at Lamport time boundaries. Message
+animations are played tick by tick, so no animation spans the start of a tick
+and every tick boundary is a quiescent point at which to split. Each segment is
+rendered in its own process: the events before the segment are fast-forwarded
+to reconstruct the state of the scene at its start, without rendering frames,
+and then the events of the segment are animated as usual. The partial movies
+are then concatenated without re-encoding. Each starts with a keyframe, being
+a separate file, so no frames are dropped or duplicated at the joins: this is
+how manim itself joins the partial movies of a serial render. bin/check-parallel
+compares the frame count and duration of both renders.
+
+Usage:
+
+    python -m manim_renderer.parallel scenes/events/CallActivity.jsonl -o CallActivity.mp4
+"""
+import argparse
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from schema.index import EventIndex
+
+QUALITIES = {
+    "l": "low_quality",
+    "m": "medium_quality",
+    "h": "high_quality",
+    "p": "production_quality",
+    "k": "fourk_quality",
+}
+
+type Segment = tuple[int | None, int | None]
+
+
+def get_segments(events_file: str, n_segments: int) -> list[Segment]:
+    """
+    Split the Lamport time range of the events into at most `n_segments`
+    windows, each containing roughly the same number of events.
+    """
+    index = EventIndex(events_file)
+    times = index.times
+    index.close()
+    if not times:
+        return [(None, None)]
+    boundaries: list[int] = []
+    for k in range(1, n_segments):
+        time = times[k * len(times) // n_segments]
+        if time > (boundaries[-1] if boundaries else times[0]):
+            boundaries.append(time)
+    return list(zip([None, *boundaries], [*boundaries, None]))
+
+
+def render_segment(
+    events_file: str, segment: Segment, quality: str, media_dir: str, name: str
+) -> str | None:
+    """
+    Render a time window of the scene, returning the path of the movie, or
+    None if the window contains no animations.
+    """
+    from manim import tempconfig
+
+    from manim_renderer.scene import TemporalScene
+
+    with tempconfig(
+        {
+            "quality": quality,
+            "media_dir": media_dir,
+            "output_file": name,
+            "disable_caching": True,
+        }
+    ):
+        scene = TemporalScene()
+        scene.events_file = events_file
+        scene.from_time, scene.to_time = segment
+        scene.render()
+        path = scene.renderer.file_writer.movie_file_path
+        return str(path) if path and os.path.exists(path) else None
+
+
+def render_parallel(
+    events_file: str, output: str, jobs: int, quality: str, media_dir: str
+):
+    name = os.path.splitext(os.path.basename(output))[0]
+    segments = get_segments(events_file, jobs)
+    # Proxies are registered in module-level state, so each segment must be
+    # rendered in a fresh process.
+    with ProcessPoolExecutor(jobs, max_tasks_per_child=1) as pool:
+        futures = [
+            pool.submit(
+                render_segment,
+                events_file,
+                segment,
+                quality,
+                media_dir,
+                f"{name}.{i:03d}",
+            )
+            for i, segment in enumerate(segments)
+        ]
+        movies = [f.result() for f in futures]
+    concatenate_movies([m for m in movies if m], output)
+
+
+def concatenate_movies(movies: list[str], output: str):
+    """
+    Concatenate movies without re-encoding.
+    """
+    with tempfile.NamedTemporaryFile("w", suffix=".txt") as file:
+        for movie in movies:
+            print(f"file '{os.path.abspath(movie)}'", file=file)
+        file.flush()
+        subprocess.run(
+            [
+                "ffmpeg",
+                "-loglevel",
+                "error",
+                "-f",
+                "concat",
+                "-safe",
+                "0",
+                "-i",
+                file.name,
+                "-c",
+                "copy",
+                "-y",
+                output,
+            ],
+            check=True,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a scene in parallel segments.")
+    parser.add_argument("events_file")
+    parser.add_argument("-o", "--output", required=True)
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("-q", "--quality", choices=list(QUALITIES), default="h")
+    parser.add_argument("--media_dir", default="scenes/media/parallel")
+    args = parser.parse_args()
+    render_parallel(
+        args.events_file,
+        args.output,
+        args.jobs,
+        QUALITIES[args.quality],
+        args.media_dir,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Build the mobjects of a scene in parallel, before rendering it.
+
+Laying out text with Pango, and highlighting code with Pygments, account for
+much of the time of a render, and normally happen one at a time as events are
+rendered. A first pass over the events collects every distinct label and code
+panel that the render will need; these are built in a pool of processes, and
+the text and code caches of this process are seeded with the results, so that
+rendering only copies prebuilt mobjects.
+
+Code panels are built once per code body: the arrows for blocked lines, and
+the border, are an overlay updated in place (see ProxyEntityWithCode).
+"""
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields
+from typing import Any, Iterable, Iterator
+
+from manim import Mobject, VDict, logger
+
+from manim_renderer import code, style
+from manim_renderer.application import ApplicationRequest
+from manim_renderer.history import History
+from manim_renderer.server import Server
+from schema import schema
+
+type CodeSource = tuple[str, str]
+
+
+def collect(
+    events: Iterable[schema.Event],
+) -> tuple[list[style.Label], set[CodeSource]]:
+    """
+    Return the labels and the code sources rendered for `events`.
+    """
+    labels: dict[tuple, style.Label] = {}
+
+    def add(label: style.Label):
+        name, args = label
+        labels.setdefault((name, *map(str, args)), label)
+
+    for label in style.known_labels():
+        add(label)
+    code_sources: set[CodeSource] = set()
+    for event in events:
+        match event:
+            case schema.InitEvent():
+                add(("title", (event.title,)))
+                code_sources.update(get_code_sources(event))
+            case schema.StateChangeEvent(entity=schema.Server() as server):
+                for history in Server.get_child_entities(server):
+                    if first := History.first_displayed_event(history.events):
+                        add(("history_summary", (first,)))
+            case schema.StateChangeEvent(entity=entity):
+                code_sources.update(get_code_sources(entity))
+            case schema.MessageEvent(message=schema.ApplicationRequest() as message):
+                add(("message", (ApplicationRequest.label(message),)))
+    return list(labels.values()), code_sources
+
+
+def get_code_sources(value: Any) -> Iterator[CodeSource]:
+    """
+    Yield the (code, language) of every entity with code within `value`.
+    """
+    match value:
+        case schema.EntityWithCode():
+            yield (value.code, value.language)
+        case schema.History():
+            pass
+        case schema.Model():
+            for f in fields(value):
+                yield from get_code_sources(getattr(value, f.name))
+        case list() | tuple() | set() | frozenset():
+            for v in value:
+                yield from get_code_sources(v)
+        case dict():
+            for v in value.values():
+                yield from get_code_sources(v)
+
+
+def build_labels(labels: list[style.Label]) -> list[tuple[tuple, Mobject]]:
+    """
+    Lay out `labels`, returning the resulting text cache entries.
+    """
+    style.text_cache.mobjects.clear()
+    for label in labels:
+        style.lay_out(label)
+    return style.text_cache.entries()
+
+
+def build_code_body(code_source: CodeSource) -> VDict:
+    return code._load_code_body(*code_source)
+
+
+def prebuild(events: Iterable[schema.Event], jobs: int):
+    """
+    Build the labels and code panels rendered for `events` in `jobs`
+    processes, and seed the text and code caches with them.
+    """
+    start = time.monotonic()
+    labels, code_sources = collect(events)
+    code_sources -= code._code_bodies.keys()
+    # Workers are forked, so that they share the manim configuration.
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(jobs, mp_context=context) as pool:
+        label_chunks = [labels[i::jobs] for i in range(jobs)]
+        label_futures = [pool.submit(build_labels, c) for c in label_chunks if c]
+        code_futures = {s: pool.submit(build_code_body, s) for s in code_sources}
+        for future in label_futures:
+            style.text_cache.seed(future.result())
+        for code_source, future in code_futures.items():
+            code._code_bodies[code_source] = future.result()
+    logger.info(
+        f"Prebuilt {len(labels)} labels and {len(code_sources)} code panels "
+        f"with {jobs} processes in {time.monotonic() - start:.1f}s"
+    )
@@ -1,118 +1,258 @@
-import json
+import heapq
+import html
+import itertools
 import os
 import sys
 from datetime import datetime
 from typing import Iterator, cast
 
-from manim import (
-    DL,
-    DOWN,
-    LEFT,
-    RIGHT,
-    SMALL_BUFF,
-    UP,
-    UR,
-    Camera,
-    Dot,
-    MarkupText,
-    Scene,
-    Text,
-)
+from manim import DL, RIGHT, UR, Dot, Text, config, logger
 
 import manim_renderer as renderer
 from manim_renderer import style
+from manim_renderer.disk_cache import mobject_cache
+from manim_renderer.entity import proxy_entity_registry
+from manim_renderer.instrumentation import profiler
+from manim_renderer.layout import Region, full_frame, layout_actors
+from manim_renderer.manim_shims import Scene
+from manim_renderer.prebuild import prebuild
 from manim_renderer.style import COLOR_SCENE_BACKGROUND
+from manim_renderer.timing import plan_timing
 from schema import schema
+from schema.timeline import (
+    Op,
+    cached_timeline,
+    compile_timeline,
+    in_lamport_order,
+    lamport_time,
+)
+
+
+def _env_int(name: str) -> int | None:
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+def _env_float(name: str) -> float | None:
+    value = os.getenv(name)
+    return float(value) if value else None
 
 
 class TemporalScene(Scene):
-    app: renderer.Application
     server: renderer.Server
-    workflow_worker: renderer.WorkflowWorker
-    activity_worker: renderer.ActivityWorker | None
+    apps: list[renderer.Application]
+    workflow_workers: list[renderer.WorkflowWorker]
+    activity_workers: list[renderer.ActivityWorker]
+    nexus_server: renderer.NexusServer | None = None
+    nexus_workers: list[renderer.NexusWorker] = []
+
+    # The event file to render (standard input if None), and the window of
+    # Lamport time to render. See render_simulation_events.
+    events_file: str | None = os.getenv("TEMPORAL_ANIMATIONS_EVENTS_FILE")
+    # If there are several event files, they are rendered side by side, as
+    # sub-scenes of the usual size, with their Lamport clocks in step.
+    events_files: list[str] = [
+        f
+        for f in os.getenv("TEMPORAL_ANIMATIONS_EVENTS_FILES", "").split(os.pathsep)
+        if f
+    ]
+    from_time: int | None = _env_int("TEMPORAL_ANIMATIONS_FROM_TIME")
+    to_time: int | None = _env_int("TEMPORAL_ANIMATIONS_TO_TIME")
+    # If set, render a storyboard into this directory instead of a video: a
+    # still image of the scene after each Lamport tick, with no tweening, and
+    # an index page.
+    storyboard_dir: str | None = os.getenv("TEMPORAL_ANIMATIONS_STORYBOARD_DIR")
+    # If either is set, fit the video to this duration in seconds, or number
+    # of frames. See timing.py.
+    target_duration: float | None = _env_float("TEMPORAL_ANIMATIONS_TARGET_DURATION")
+    frame_budget: int | None = _env_int("TEMPORAL_ANIMATIONS_FRAME_BUDGET")
+    # If set, build labels and code panels in this many processes before
+    # rendering. See prebuild.py. Event files are read twice, the first time to
+    # collect what to build; standard input can only be read once, so it is
+    # then buffered in memory, and rendering starts only at its end.
+    prebuild_jobs: int | None = _env_int("TEMPORAL_ANIMATIONS_PREBUILD_JOBS")
+
+    def __init__(self, *args, **kwargs):
+        if (n := len(self.events_files)) > 1:
+            config.frame_width *= n
+            config.pixel_width *= n
+        # Read by both the Cairo camera and the OpenGL renderer on creation.
+        config.background_color = COLOR_SCENE_BACKGROUND
+        super().__init__(*args, **kwargs)
 
     def construct(self):
-        events = read_events()
-        match event := next(events):
-            case schema.NexusInitEvent():
-                self.init_nexus(event)
-            case schema.InitEvent():
-                self.init(event)
-            case _:
-                raise ValueError("The first event must be an InitEvent")
-        renderer.render_simulation_events(events)
-        self.wait(2)
+        if self.from_time is not None or self.storyboard_dir:
+            # Nothing before the window is rendered, including the waits of
+            # init(); replay_timeline() stops fast-forwarding at `from_time`.
+            # A storyboard is never tweened.
+            self.fast_forward = True
+        if len(self.events_files) == 1:
+            # A single file in the list is rendered on its own.
+            [self.events_file] = self.events_files
+        if len(self.events_files) > 1:
+            events, title, lamport_skew = self.init_side_by_side()
+            if self.prebuild_jobs:
+                events = self.prebuild_mobjects(events)
+        else:
+            events = read_events(self.events_file)
+            event = read_init_event(events)
+            if self.prebuild_jobs:
+                events = self.prebuild_mobjects(events, event)
+            self.init(event)
+            title, lamport_skew = event.title, event.lamport_skew
+        if self.storyboard_dir:
+            self.render_storyboard(events, title, lamport_skew)
+            return
+        ops = self.timeline(events, lamport_skew)
+        if self.target_duration is not None or self.frame_budget is not None:
+            ops = list(ops)
+            plan = plan_timing(
+                ops,
+                self.target_duration,
+                self.frame_budget,
+                # The initialization, already rendered at normal speed.
+                elapsed=self.renderer.time,
+            )
+            self.run_time_scale, self.wait_scale = plan.run_time_scale, plan.wait_scale
+            logger.info(f"Timing: {plan}")
+        renderer.replay_timeline(ops, self.from_time, self.to_time)
+        if self.to_time is None:
+            self.wait(2)
+        logger.info(f"Text cache: {style.text_cache.stats()}")
+        logger.info(f"Mobject cache: {mobject_cache.stats()}")
+        profiler.write_report()
 
     def init(
         self,
         event: schema.InitEvent,
+        region: Region | None = None,
     ):
         """
-        Initialize the manim scene.
+        Initialize the manim scene, with the actors in `region` of the frame
+        (by default the whole frame).
         """
+        region = region or full_frame()
         renderer.set_scene(self)
+        style.prewarm_text_cache()
         self.add(
-            MarkupText(
-                f'<span underline="single">{event.title}</span>',
-                font=style.FONT_ACTOR,
-                font_size=style.FONT_SIZE_TITLE,
-            ).align_on_border(UR)
+            style.title(event.title)
+            .align_on_border(UR)
+            .shift((region[1] - config.frame_width / 2) * RIGHT)
         )
-        assert isinstance(self.camera, Camera)
-        self.camera.background_color = COLOR_SCENE_BACKGROUND
-
-        server = renderer.Server(event.server)
-        [app] = [renderer.Application(a) for a in event.apps]
-        [wworker] = [renderer.WorkflowWorker(w) for w in event.workflow_workers]
-        aworkers = [renderer.ActivityWorker(w) for w in event.activity_workers]
-
-        app.set_dock_direction(RIGHT).mobj.align_on_border(
-            UP, buff=0.25
-        ).align_on_border(LEFT, buff=SMALL_BUFF)
-        wworker.set_dock_direction(RIGHT).mobj.next_to(app.mobj, DOWN).align_to(
-            app.mobj, LEFT
-        ).shift(DOWN * 0.2)
-        server.set_dock_direction(UP).mobj.align_on_border(RIGHT).align_to(
-            wworker.mobj, UP
-        ).shift(1.5 * LEFT)
-        if aworkers:
-            [aworker] = aworkers
-            aworker.set_dock_direction(RIGHT).mobj.next_to(
-                wworker.children[-1].mobj, DOWN
-            ).align_to(wworker.mobj, LEFT).shift(DOWN * 0.5)
-        else:
-            aworker = None
 
-        self.add(app.mobj, server.mobj, wworker.mobj, *(a.mobj for a in aworkers))
+        self.server = renderer.Server(event.server)
+        self.apps = [renderer.Application(a) for a in event.apps]
+        self.workflow_workers = [
+            renderer.WorkflowWorker(w) for w in event.workflow_workers
+        ]
+        self.activity_workers = [
+            renderer.ActivityWorker(w) for w in event.activity_workers
+        ]
+        actors: list[renderer.ProxyEntity] = [
+            self.server,
+            *self.apps,
+            *self.workflow_workers,
+            *self.activity_workers,
+        ]
+        if isinstance(event, schema.NexusInitEvent):
+            self.nexus_server = renderer.NexusServer(event.nexus_server)
+            self.nexus_workers = [renderer.NexusWorker(w) for w in event.nexus_workers]
+            actors += [self.nexus_server, *self.nexus_workers]
+
+        layout_actors(actors, region)
+        self.add(*(a.mobj for a in actors))
+        proxy_entity_registry.put_actors(*actors)
 
         for a, s in zip(
-            [server, *[app], *[wworker]],
+            [self.server, *self.apps, *self.workflow_workers],
             [event.server, *event.apps, *event.workflow_workers],
         ):
             a.render_to_scene(s)  # type: ignore
 
-        self.app = app
-        self.server = server
-        self.workflow_worker = wworker
-        self.activity_worker = aworker
+    def timeline(
+        self,
+        events: Iterator[schema.Event],
+        lamport_skew: int | None,
+    ) -> Iterator[Op]:
+        """
+        Return the timeline of `events`, cached by content if they were read
+        from a single event file.
+        """
+        events = profiler.decode(events)
+        if self.events_file and len(self.events_files) <= 1:
+            return cached_timeline(self.events_file, events, lamport_skew)
+        return compile_timeline(events, lamport_skew)
+
+    def prebuild_mobjects(
+        self, events: Iterator[schema.Event], *init_events: schema.InitEvent
+    ) -> Iterator[schema.Event]:
+        """
+        Build the mobjects rendered for `init_events` and `events` in parallel,
+        and return `events`. Event files are read again for this, so that
+        `events` are still streamed.
+        """
+        jobs = cast(int, self.prebuild_jobs)
+        events_files = self.events_files or (
+            [self.events_file] if self.events_file else []
+        )
+        if events_files:
+            prebuild(
+                itertools.chain.from_iterable(
+                    read_events(f, namespace=str(i)) for i, f in enumerate(events_files)
+                ),
+                jobs,
+            )
+            return events
+        buffered = list(events)
+        prebuild([*init_events, *buffered], jobs)
+        return iter(buffered)
+
+    def init_side_by_side(self) -> tuple[Iterator[schema.Event], str, int]:
+        """
+        Initialize a sub-scene for each event file, side by side, and return
+        the events of all files merged in Lamport time order, a title, and the
+        Lamport skew of the merged events.
+        """
+        width = config.frame_width / len(self.events_files)
+        streams: list[Iterator[schema.Event]] = []
+        titles: list[str] = []
+        for i, events_file in enumerate(self.events_files):
+            events = read_events(events_file, namespace=str(i))
+            event = read_init_event(events)
+            left = -config.frame_width / 2 + i * width
+            self.init(event, (left, left + width))
+            if i > 0:
+                self.add(style.divider(left))
+            streams.append(in_lamport_order(events, event.lamport_skew))
+            titles.append(event.title)
+        return heapq.merge(*streams, key=lamport_time), " | ".join(titles), 0
+
+    def render_storyboard(
+        self, events: Iterator[schema.Event], title: str, lamport_skew: int | None
+    ):
+        storyboard_dir = cast(str, self.storyboard_dir)
+        os.makedirs(storyboard_dir, exist_ok=True)
+        frames: list[tuple[str, str]] = []
 
-    def init_nexus(self, event: schema.NexusInitEvent):
-        self.init(event)
-        nexus_server = renderer.NexusServer(event.nexus_server)
-        [nexus_worker] = [renderer.NexusWorker(w) for w in event.nexus_workers]
+        def save_frame(label: str):
+            self.renderer.update_frame(self)
+            filename = f"{len(frames):04d}.png"
+            self.renderer.get_image().save(os.path.join(storyboard_dir, filename))
+            frames.append((label, filename))
 
-        self.workflow_worker.mobj.shift(DOWN * 3)
-        for c in self.workflow_worker.children:
-            c.mobj.shift(DOWN * 3)
+        def save_tick(time: int):
+            if self.from_time is None or time >= self.from_time:
+                save_frame(f"Lamport time {time}")
 
-        nexus_server.set_dock_direction(DL).mobj.next_to(self.server.mobj, UP).align_to(
-            self.server.mobj, LEFT
+        if self.from_time is None:
+            save_frame("Start")
+        # Fast-forwarding throughout, so only the ticks in the window are saved.
+        renderer.render_simulation_events(
+            events, lamport_skew, to_time=self.to_time, on_tick=save_tick
         )
-        nexus_worker.set_dock_direction(RIGHT).mobj.next_to(
-            self.app.mobj, DOWN
-        ).align_to(self.app.mobj, LEFT)
-
-        self.add(nexus_server.mobj, nexus_worker.mobj)
+        with open(os.path.join(storyboard_dir, "index.html"), "w") as file:
+            file.write(storyboard_index(title, frames))
+        logger.info(f"Wrote {len(frames)} storyboard frames to {storyboard_dir}")
 
     def add_timestamp(self):
         time = Text(datetime.now().strftime("%H:%M:%S"), font_size=8)
@@ -123,11 +263,46 @@ class TemporalScene(Scene):
         self.add(Dot().move_to(entity.dock_point()))
 
 
-def read_events() -> Iterator[schema.Event]:
-    if events_file := os.getenv("TEMPORAL_ANIMATIONS_EVENTS_FILE"):
+def storyboard_index(title: str, frames: list[tuple[str, str]]) -> str:
+    figures = "\n".join(
+        f'<figure><img src="{filename}"><figcaption>{html.escape(label)}'
+        "</figcaption></figure>"
+        for label, filename in frames
+    )
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{html.escape(title)}</title>
+<style>
+body {{ background: {COLOR_SCENE_BACKGROUND}; color: #DDDDDD; }}
+figure {{ margin: 1em 0; }}
+img {{ max-width: 100%; }}
+</style>
+</head>
+<body>
+<h1>{html.escape(title)}</h1>
+{figures}
+</body>
+</html>
+"""
+
+
+def read_events(
+    events_file: str | None, namespace: str | None = None
+) -> Iterator[schema.Event]:
+    if events_file:
         file = open(events_file)
     else:
         file = sys.stdin
-    for line in file.readlines():
-        data = json.loads(line)
-        yield cast(schema.Event, schema.from_serializable(data))
+    # Each namespace has its own interned strings.
+    interned = None if namespace is None else {}
+    yield from schema.read_events(file, interned, namespace)
+
+
+def read_init_event(events: Iterator[schema.Event]) -> schema.InitEvent:
+    match event := next(events):
+        case schema.InitEvent():
+            return event
+        case _:
+            raise ValueError("The first event must be an InitEvent")
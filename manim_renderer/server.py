@@ -10,6 +10,7 @@ from schema import schema
 class Server(ProxyEntityWithChildren[schema.Server, schema.History, History]):
     child_cls = History
     child_align_direction = LEFT
+    visual_fields = ()
 
     def render(self, entity: schema.Server) -> Mobject:
         return self.with_time(style.actor("Temporal Server"), entity)
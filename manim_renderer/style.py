@@ -1,17 +1,30 @@
+from collections import OrderedDict
+from typing import Any, Type
+
 from manim import (
     BLUE_E,
+    DOWN,
+    GREEN_D,
     LIGHTER_GRAY,
     ORANGE,
+    RED_D,
     Line,
     ManimColor,
+    MarkupText,
     Mobject,
     Point,
     SurroundingRectangle,
     Text,
+    UP,
     VGroup,
+    config,
+    logger,
 )
 from manim.typing import Point3D
 
+from manim_renderer.disk_cache import mobject_cache
+from schema import schema
+
 FONT_MONOSPACE = "Monaco"  # Monaco, Menlo, PT Mono
 FONT_SANS = "Noto Sans Kannada"
 FONT_MESSAGE = FONT_MONOSPACE
@@ -32,15 +45,139 @@ COLOR_CODE_LINE_ARROW = ORANGE
 COLOR_INACTIVE_CODE = LIGHTER_GRAY
 COLOR_SCENE_BACKGROUND = "#1D1D1D"
 COLOR_HISTORY_EVENT_GROUP_RECT = LIGHTER_GRAY
+COLOR_SEEN_HISTORY_EVENT = GREEN_D
+COLOR_UNSEEN_HISTORY_EVENT = RED_D
+COLOR_HISTORY_SUMMARY = LIGHTER_GRAY
+COLOR_DIVIDER = "#DDDDDD"
 RECT_CORNER_RADIUS = 0.2
 STROKE_WIDTH_HISTORY_EVENT_GROUP_RECT = 1
 STROKE_WIDTH_PENDING_REQUEST_RAY = 1
 STROKE_OPACITY_PENDING_REQUEST_RAY = 0.7
+STROKE_WIDTH_DIVIDER = 1
 BUFF_PENDING_REQUEST = 0.5
+TEXT_CACHE_SIZE = 512
+
+# Labels that are known before any events are seen, used to pre-warm the text
+# cache.
+ACTOR_LABELS = [
+    "Temporal Server",
+    "Your Application",
+    "Workflow Worker",
+    "Activity Worker",
+    "Nexus Server",
+    "Nexus Worker",
+]
+MESSAGE_LABELS = [
+    "WFT",
+    "WFT Completed",
+    "Activity Task",
+    "Activity Task Completed",
+    *(t.name for t in schema.ApplicationRequestType),
+]
+
+
+class TextCache:
+    """
+    A bounded cache of Text and MarkupText mobjects, keyed by text and style.
+
+    Text layout by Pango is expensive, and the same few strings are laid out
+    over and over again. The cache returns copies of the mobjects it holds.
+    Misses are looked up in the cache on disk shared by renders (see
+    disk_cache.py).
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.mobjects: OrderedDict[tuple, Mobject] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, cls: Type[Text | MarkupText], text: str, **kwargs: Any) -> Mobject:
+        key = (cls.__name__, text, *((k, str(v)) for k, v in sorted(kwargs.items())))
+        if (mobj := self.mobjects.get(key)) is not None:
+            self.hits += 1
+            self.mobjects.move_to_end(key)
+        else:
+            self.misses += 1
+            mobj = self.mobjects[key] = mobject_cache.get(
+                key, lambda: cls(text, **kwargs)
+            )
+            if len(self.mobjects) > self.maxsize:
+                self.mobjects.popitem(last=False)
+        return mobj.copy()
+
+    def entries(self) -> list[tuple[tuple, Mobject]]:
+        return list(self.mobjects.items())
+
+    def seed(self, entries: list[tuple[tuple, Mobject]]):
+        """
+        Add mobjects laid out elsewhere, e.g. by another process (see
+        prebuild.py).
+        """
+        for key, mobj in entries:
+            self.mobjects[key] = mobj
+            self.mobjects.move_to_end(key)
+        while len(self.mobjects) > self.maxsize:
+            self.mobjects.popitem(last=False)
+
+    def stats(self) -> str:
+        lookups = self.hits + self.misses
+        return (
+            f"{self.hits}/{lookups} hits, {self.misses} misses, "
+            f"{len(self.mobjects)} cached"
+        )
+
+
+text_cache = TextCache(TEXT_CACHE_SIZE)
+
+
+# A label: the name of the function of this module that lays it out, and its
+# arguments.
+type Label = tuple[str, tuple[Any, ...]]
+
+
+def known_labels() -> list[Label]:
+    """
+    Return every label that is known before any events are seen.
+    """
+    return [
+        *(("actor", (name,)) for name in ACTOR_LABELS),
+        *(("message", (name,)) for name in MESSAGE_LABELS),
+        *(
+            ("history_event", (event_type.name, color))
+            for event_type in schema.HistoryEventType
+            for color in [COLOR_SEEN_HISTORY_EVENT, COLOR_UNSEEN_HISTORY_EVENT]
+        ),
+        ("requested_update", ("[update requested]",)),
+    ]
+
+
+def lay_out(label: Label) -> Mobject:
+    name, args = label
+    return globals()[name](*args)
+
+
+def prewarm_text_cache():
+    """
+    Lay out every label that is known before any events are seen.
+    """
+    for label in known_labels():
+        lay_out(label)
+    logger.info(f"Pre-warmed text cache: {text_cache.stats()}")
+
+
+def title(text: str) -> Mobject:
+    return text_cache.get(
+        MarkupText,
+        f'<span underline="single">{text}</span>',
+        font=FONT_TITLE,
+        font_size=FONT_SIZE_TITLE,
+    )
 
 
 def message(name: str) -> Mobject:
-    text = Text(
+    text = text_cache.get(
+        Text,
         name,
         font=FONT_MESSAGE,
         font_size=FONT_SIZE_MESSAGE,
@@ -66,8 +203,20 @@ def pending_request_ray(start: Point3D, end: Point3D) -> Mobject:
     )
 
 
+def divider(x: float) -> Mobject:
+    """
+    A vertical line separating side-by-side scenes.
+    """
+    return Line(
+        start=config.frame_height / 2 * UP,
+        end=config.frame_height / 2 * DOWN,
+        stroke_color=COLOR_DIVIDER,
+        stroke_width=STROKE_WIDTH_DIVIDER,
+    ).set_x(x)
+
+
 def invisible_message() -> Mobject:
-    return Text(".").set_opacity(0)
+    return text_cache.get(Text, ".").set_opacity(0)
 
 
 def invisible_point() -> Mobject:
@@ -75,17 +224,32 @@ def invisible_point() -> Mobject:
 
 
 def actor(name: str) -> Mobject:
-    return Text(name, font=FONT_ACTOR, font_size=FONT_SIZE_ACTOR)
+    return text_cache.get(Text, name, font=FONT_ACTOR, font_size=FONT_SIZE_ACTOR)
 
 
 def history_event(name: str, color: ManimColor) -> Mobject:
-    return Text(
-        name, font=FONT_HISTORY_EVENT, font_size=FONT_SIZE_HISTORY_EVENT, color=color
+    return text_cache.get(
+        Text,
+        name,
+        font=FONT_HISTORY_EVENT,
+        font_size=FONT_SIZE_HISTORY_EVENT,
+        color=color,
+    )
+
+
+def history_summary(n_events: int) -> Mobject:
+    return text_cache.get(
+        Text,
+        f"+{n_events} earlier events",
+        font=FONT_HISTORY_EVENT,
+        font_size=FONT_SIZE_HISTORY_EVENT,
+        color=COLOR_HISTORY_SUMMARY,
     )
 
 
 def requested_update(name: str) -> Mobject:
-    return Text(
+    return text_cache.get(
+        Text,
         name,
         font=FONT_HISTORY_EVENT,
         font_size=FONT_SIZE_HISTORY_EVENT,
@@ -0,0 +1,74 @@
+"""
+Fit the animation of a simulation to a target duration.
+
+At normal speed every message exchange, new child and worker update is played
+at a fixed pace, so the length of a video grows with the number of events. A
+timing plan takes the duration of the video at normal speed from its timeline
+(see schema/timeline.py), and chooses scale factors for the scene: waits are
+compressed first, and animations are sped up only if that is not enough.
+
+The initialization of the scene is rendered before the plan is made, at normal
+speed, and is deducted from the target. Each play or wait renders a whole
+number of frames, up to one more than its duration, so a frame is reserved for
+each.
+"""
+import math
+from dataclasses import dataclass
+from typing import Iterable
+
+from manim import config
+
+from schema.timeline import DEFAULT_WAIT_TIME, RUN_TIME, Op, duration
+
+# The wait at the end of TemporalScene.construct.
+FINAL_WAIT = 2.0
+# Animations are never sped up beyond this factor.
+MIN_RUN_TIME_SCALE = 0.1
+
+
+@dataclass
+class TimingPlan:
+    run_time_scale: float = 1.0
+    wait_scale: float = 1.0
+
+
+def plan_timing(
+    ops: Iterable[Op],
+    target_duration: float | None = None,
+    frame_budget: int | None = None,
+    elapsed: float = 0.0,
+) -> TimingPlan:
+    """
+    Return a plan fitting the animation of `ops`, a timeline, into
+    `target_duration` seconds, or `frame_budget` frames at the configured
+    frame rate, of which `elapsed` seconds have already been rendered.
+    """
+    if frame_budget is not None:
+        target_duration = frame_budget / config.frame_rate
+    if target_duration is None:
+        return TimingPlan()
+    ops = list(ops)
+    run_time, wait_time = duration(ops)
+    wait_time += FINAL_WAIT
+    # A frame of rounding for each play and wait, and for the final wait.
+    target_duration -= elapsed + (render_calls(ops) + 1) / config.frame_rate
+    if target_duration >= run_time + wait_time:
+        return TimingPlan()
+    if target_duration > run_time or not run_time:
+        return TimingPlan(wait_scale=max(target_duration - run_time, 0) / wait_time)
+    return TimingPlan(
+        run_time_scale=max(target_duration / run_time, MIN_RUN_TIME_SCALE),
+        wait_scale=0.0,
+    )
+
+
+def render_calls(ops: list[Op]) -> int:
+    """
+    Return the number of plays and waits rendering `ops`, not counting the
+    final wait. Each play runs for RUN_TIME at normal speed, and each wait for
+    at most DEFAULT_WAIT_TIME.
+    """
+    return sum(
+        round(op.run_time / RUN_TIME) + math.ceil(op.wait_time / DEFAULT_WAIT_TIME)
+        for op in ops
+    )
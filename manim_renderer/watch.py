@@ -0,0 +1,240 @@
+"""
+Re-simulate and re-render scenes as their sources change.
+
+The watcher polls the modification times of the Python sources. When some
+change, it works out which stages they affect, from the import graph of the
+sources:
+
+- A scene is re-simulated if one of the modules imported (transitively) by
+  its script has changed.
+- A scene is re-rendered if its events have changed, or if one of the modules
+  imported by the renderer has changed.
+
+Renders are low-quality previews, written to scenes/media/<scene>/preview.mp4,
+so that the time from an edit to a preview is a few seconds. They are
+rendered with the Cairo renderer.
+
+Usage:
+
+    python -m manim_renderer.watch [--open] [SCENE ...]
+"""
+import argparse
+import ast
+import glob
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from manim_renderer import farm
+
+WATCHED_DIRS = ["scenes", "tempyral", "schema", "common", "manim_renderer"]
+# Top-level packages whose modules are sources in this repository.
+LOCAL_PACKAGES = set(WATCHED_DIRS)
+RENDERER_MAIN = "manim_renderer/scene.py"
+POLL_INTERVAL = 0.5
+PREVIEW_QUALITY = "l"
+
+
+def module_path(module: str) -> str | None:
+    path = module.replace(".", os.sep)
+    for candidate in [f"{path}.py", os.path.join(path, "__init__.py")]:
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def imported_modules(path: str) -> set[str]:
+    """
+    Return the names of the modules imported anywhere in the source file at
+    `path`, including the packages containing them.
+    """
+    with open(path) as file:
+        tree = ast.parse(file.read(), path)
+    modules: set[str] = set()
+    for node in ast.walk(tree):
+        match node:
+            case ast.Import():
+                modules.update(alias.name for alias in node.names)
+            case ast.ImportFrom(module=str(module), level=0):
+                modules.add(module)
+                # `from package import module`
+                modules.update(f"{module}.{alias.name}" for alias in node.names)
+    for module in list(modules):
+        parts = module.split(".")
+        modules.update(".".join(parts[:i]) for i in range(1, len(parts)))
+    return modules
+
+
+def dependencies(path: str) -> set[str]:
+    """
+    Return the source files imported, transitively, by the source file at
+    `path`, together with `path` itself.
+    """
+    deps: set[str] = set()
+    stack = [path]
+    while stack:
+        path = stack.pop()
+        if path in deps:
+            continue
+        deps.add(path)
+        for module in imported_modules(path):
+            if module.split(".")[0] in LOCAL_PACKAGES and (dep := module_path(module)):
+                stack.append(dep)
+    return deps
+
+
+def source_mtimes() -> dict[str, float]:
+    return {
+        path: os.path.getmtime(path)
+        for d in WATCHED_DIRS
+        for path in glob.glob(os.path.join(d, "**", "*.py"), recursive=True)
+    }
+
+
+def simulate(scene: str) -> bool:
+    """
+    Simulate `scene`, writing its event file. Return whether the events have
+    changed.
+    """
+    events_file = os.path.join("scenes", "events", f"{scene}.jsonl")
+    result = subprocess.run(
+        [sys.executable, os.path.join("scenes", f"{scene}.py")],
+        capture_output=True,
+        check=True,
+    )
+    if os.path.exists(events_file):
+        with open(events_file, "rb") as file:
+            if file.read() == result.stdout:
+                return False
+    with open(events_file, "wb") as file:
+        file.write(result.stdout)
+    return True
+
+
+def preview_path(scene: str) -> str:
+    return os.path.join(farm.MEDIA_DIR, scene, "preview.mp4")
+
+
+def render_preview(scene: str, renderer: str):
+    events_file = os.path.join("scenes", "events", f"{scene}.jsonl")
+    farm.render(
+        scene,
+        PREVIEW_QUALITY,
+        {"TEMPORAL_ANIMATIONS_EVENTS_FILE": events_file},
+        output=preview_path(scene),
+        renderer=renderer,
+    )
+
+
+class Watcher:
+    def __init__(self, scenes: list[str], open_previews: bool, renderer: str):
+        self.scenes = scenes
+        self.open_previews = open_previews
+        self.renderer = renderer
+        self.mtimes = source_mtimes()
+        # Changes not yet acted upon, because the import graph could not be
+        # read, e.g. while a source has a syntax error.
+        self.unhandled: set[str] = set()
+        self.pool = ThreadPoolExecutor(farm.default_jobs())
+
+    def run(self):
+        self.update(
+            to_simulate=[],
+            to_render=[s for s in self.scenes if not os.path.exists(preview_path(s))],
+        )
+        print(f"Watching {', '.join(WATCHED_DIRS)}", flush=True)
+        while True:
+            time.sleep(POLL_INTERVAL)
+            mtimes = source_mtimes()
+            changed = {
+                path
+                for path in mtimes.keys() | self.mtimes.keys()
+                if mtimes.get(path) != self.mtimes.get(path)
+            }
+            self.mtimes = mtimes
+            if changed:
+                self.on_change(changed)
+
+    def on_change(self, changed: set[str]):
+        print(f"Changed: {', '.join(sorted(changed))}", flush=True)
+        changed = changed | self.unhandled
+        try:
+            to_simulate = [
+                scene
+                for scene in self.scenes
+                if changed & dependencies(os.path.join("scenes", f"{scene}.py"))
+            ]
+            to_render = self.scenes if changed & dependencies(RENDERER_MAIN) else []
+        except (SyntaxError, OSError) as err:
+            # Sources are often broken mid-edit: wait for the next change.
+            print(f"Cannot read imports: {err!r}", flush=True)
+            self.unhandled = changed
+            return
+        self.unhandled = set()
+        self.update(to_simulate, to_render)
+
+    def update(self, to_simulate: list[str], to_render: list[str]):
+        start = time.monotonic()
+        to_render = list(to_render)
+        events_changed = self.pool.map(self.simulate, to_simulate)
+        for scene, changed in zip(to_simulate, events_changed):
+            if changed and scene not in to_render:
+                to_render.append(scene)
+        for scene, ok in zip(to_render, self.pool.map(self.render, to_render)):
+            if ok and self.open_previews:
+                subprocess.run([os.path.join("bin", "play"), preview_path(scene)])
+        if to_simulate or to_render:
+            print(f"Done in {time.monotonic() - start:.1f}s", flush=True)
+
+    def simulate(self, scene: str) -> bool:
+        try:
+            changed = simulate(scene)
+        except subprocess.CalledProcessError as err:
+            print(f"{scene}: simulation failed", flush=True)
+            sys.stdout.write(err.stderr.decode(errors="replace"))
+            return False
+        status = "changed" if changed else "unchanged"
+        print(f"{scene}: simulated, events {status}", flush=True)
+        return changed
+
+    def render(self, scene: str) -> bool:
+        start = time.monotonic()
+        try:
+            render_preview(scene, self.renderer)
+        except subprocess.CalledProcessError as err:
+            print(f"{scene}: render failed", flush=True)
+            sys.stdout.write(err.stderr.decode(errors="replace"))
+            return False
+        seconds = time.monotonic() - start
+        print(f"{scene}: {preview_path(scene)} ({seconds:.1f}s)", flush=True)
+        return True
+
+
+def main():
+    all_scenes = sorted(
+        os.path.splitext(os.path.basename(path))[0]
+        for path in glob.glob(os.path.join("scenes", "*.py"))
+    )
+    parser = argparse.ArgumentParser(description="Re-render scenes as they change.")
+    parser.add_argument("scenes", nargs="*", help="default: all scenes")
+    parser.add_argument("--open", action="store_true", help="open each new preview")
+    parser.add_argument(
+        "--renderer",
+        choices=list(farm.RENDERER_FLAGS),
+        default="cairo",
+        # Undocumented until bin/check-renderers passes with OpenGL.
+        help=argparse.SUPPRESS,
+    )
+    args = parser.parse_args()
+    if unknown := set(args.scenes) - set(all_scenes):
+        parser.error(f"Unknown scenes: {', '.join(sorted(unknown))}")
+    try:
+        Watcher(args.scenes or all_scenes, args.open, args.renderer).run()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
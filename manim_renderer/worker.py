@@ -7,6 +7,8 @@ from schema import schema
 
 
 class ActivityTaskRequest(ProxyEntity[schema.WorkerPollRequest]):
+    visual_fields = ("stage",)
+
     def render(self, entity: schema.WorkerPollRequest) -> Mobject:
         if entity.stage == schema.RequestResponseStage.Request:
             return style.invisible_message()
@@ -15,6 +17,8 @@ class ActivityTaskRequest(ProxyEntity[schema.WorkerPollRequest]):
 
 
 class ActivityTaskCompleted(ProxyEntity[schema.ActivityTaskCompleted]):
+    visual_fields = ()
+
     def render(self, _: schema.ActivityTaskCompleted) -> Mobject:
         return style.message("Activity Task Completed")
 
@@ -27,13 +31,20 @@ class ActivityWorker(ProxyEntityWithCode[schema.ActivityWorker]):
             DOWN, buff=SMALL_BUFF, aligned_edge=LEFT
         )
 
+    def code_panel(self) -> VDict:
+        return self.mobj["code"]
+
 
 class WorkflowTaskCompleted(ProxyEntity[schema.WorkflowTaskCompleted]):
+    visual_fields = ()
+
     def render(self, _: schema.WorkflowTaskCompleted) -> Mobject:
         return style.message("WFT Completed")
 
 
 class WorkerRequest(ProxyEntity[schema.WorkerRequest]):
+    visual_fields = ("_type",)
+
     def render(self, entity: schema.WorkerRequest) -> Mobject:
         return style.message(f"WorkerRequest[{entity.__class__.__name__}]")
 
@@ -47,6 +58,7 @@ class WorkflowWorker(
 ):
     child_cls = Workflow
     child_align_direction = LEFT
+    visual_fields = ()
 
     def render(self, entity: schema.WorkflowWorker) -> Mobject:
         return self.with_time(style.actor("Workflow Worker"), entity)
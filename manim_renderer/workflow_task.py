@@ -31,6 +31,8 @@ class BoxedHistoryEvents(HistoryEvents):
 
 
 class WorkflowTaskRequest(ProxyEntity[schema.WorkerPollRequest]):
+    visual_fields = ("stage", "task")
+
     def render(self, entity: schema.WorkerPollRequest) -> Mobject:
         if entity.stage == schema.RequestResponseStage.Request:
             return style.invisible_message()
@@ -0,0 +1,176 @@
+"""
+A sidecar index over a JSONL event file.
+
+The index maps the Lamport time and the entity keys of each event to the byte
+range of its line in the event file, so that a reader can jump directly to the
+events in a time window, or to the state history of a single entity, without
+parsing the rest of the file. The simulator writes the index incrementally,
+alongside the events; if there is no sidecar, one is built by scanning the
+event file once.
+"""
+import bisect
+import json
+import mmap
+import os
+from dataclasses import asdict, dataclass
+from typing import IO, Any, Iterator, cast
+
+from schema import schema
+
+INDEX_SUFFIX = ".index.jsonl"
+
+
+@dataclass
+class IndexEntry:
+    offset: int
+    length: int
+    event_type: str
+    # None for records that are not timed events (InitEvent, InternEvent)
+    time: int | None
+    keys: list[schema.EntityKey]
+
+    @classmethod
+    def for_event_data(
+        cls, data: dict[str, Any], offset: int, length: int
+    ) -> "IndexEntry":
+        """
+        Create the index entry for the serialized event `data`, whose line
+        occupies `length` bytes at `offset` in the event file.
+        """
+        match data["_type"]:
+            case "StateChangeEvent":
+                entities = [data["entity"]]
+            case "MessageEvent":
+                entities = [data["sender"], data["receiver"], data["message"]]
+            case _:
+                entities = []
+        return cls(
+            offset,
+            length,
+            data["_type"],
+            schema.serialized_lamport_time(data),
+            [(e["_type"], e["id"]) for e in entities],
+        )
+
+
+class IndexWriter:
+    """
+    Append an entry to the index for each line written to the event file.
+    """
+
+    def __init__(self, path: str):
+        self.file = open(path, "w")
+        self.offset = 0
+
+    def write(self, data: dict[str, Any], line: str):
+        length = len(line.encode()) + 1
+        entry = IndexEntry.for_event_data(data, self.offset, length)
+        print(json.dumps(asdict(entry)), file=self.file, flush=True)
+        self.offset += length
+
+
+def index_path_for(events_path: str) -> str:
+    return events_path.removesuffix(".jsonl") + INDEX_SUFFIX
+
+
+def build_index(events_path: str, index_path: str):
+    with open(events_path, "rb") as file:
+        writer = IndexWriter(index_path)
+        for line in file:
+            data = json.loads(line)
+            writer.write(data, line.decode().rstrip("\n"))
+        writer.file.close()
+
+
+class EventIndex:
+    """
+    Random access to the events of an indexed event file.
+    """
+
+    def __init__(self, events_path: str, index_path: str | None = None):
+        index_path = index_path or index_path_for(events_path)
+        if not os.path.exists(index_path) or os.path.getmtime(
+            index_path
+        ) < os.path.getmtime(events_path):
+            build_index(events_path, index_path)
+        with open(index_path) as file:
+            self.entries = _read_entries(file)
+
+        self.file = open(events_path, "rb")
+        # An empty file, e.g. from a simulation that crashed before writing
+        # anything, cannot be mapped; it has no entries to decode.
+        self.mmap: mmap.mmap | bytes = b""
+        if os.fstat(self.file.fileno()).st_size:
+            self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # Timed events in the order in which a renderer processes them: by
+        # Lamport time, then by position in the file.
+        self.timed = sorted(
+            (e for e in self.entries if e.time is not None),
+            key=lambda e: (e.time, e.offset),
+        )
+        self.times = [cast(int, e.time) for e in self.timed]
+        self.by_entity: dict[schema.EntityKey, list[IndexEntry]] = {}
+        for e in self.timed:
+            for key in e.keys:
+                self.by_entity.setdefault(key, []).append(e)
+
+        # Interned strings must be defined before any event referring to them
+        # is decoded.
+        for e in self.entries:
+            if e.event_type == schema.InternEvent.__name__:
+                self._decode(e)
+
+    def init_event(self) -> schema.InitEvent:
+        [entry] = [
+            e
+            for e in self.entries
+            if e.event_type
+            in (schema.InitEvent.__name__, schema.NexusInitEvent.__name__)
+        ]
+        return self._decode(entry)
+
+    def events(
+        self, from_time: int | None = None, to_time: int | None = None
+    ) -> Iterator[schema.Event]:
+        """
+        Yield the events with Lamport time in [from_time, to_time), in Lamport
+        time order.
+        """
+        start = 0 if from_time is None else bisect.bisect_left(self.times, from_time)
+        end = (
+            len(self.times)
+            if to_time is None
+            else bisect.bisect_left(self.times, to_time)
+        )
+        for e in self.timed[start:end]:
+            yield self._decode(e)
+
+    def entity_history(self, key: schema.EntityKey) -> Iterator[schema.Entity]:
+        """
+        Yield the successive states of the entity identified by `key`.
+        """
+        for e in self.by_entity.get(key, []):
+            if e.event_type == schema.StateChangeEvent.__name__:
+                yield cast(schema.StateChangeEvent, self._decode(e)).entity
+
+    def _decode(self, entry: IndexEntry) -> Any:
+        line = self.mmap[entry.offset : entry.offset + entry.length]
+        match event := schema.from_serializable(json.loads(line)):
+            case schema.InternEvent():
+                schema.interned_strings[event.id] = event.value
+        return event
+
+    def close(self):
+        if isinstance(self.mmap, mmap.mmap):
+            self.mmap.close()
+        self.file.close()
+
+
+def _read_entries(file: IO[str]) -> list[IndexEntry]:
+    entries = []
+    for line in file:
+        data = json.loads(line)
+        data["keys"] = [tuple(k) for k in data["keys"]]
+        entries.append(IndexEntry(**data))
+    return entries
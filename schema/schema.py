@@ -1,7 +1,8 @@
+import json
 import sys
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Hashable, OrderedDict
+from typing import IO, Any, Hashable, Iterator, OrderedDict, cast
 
 
 @dataclass
@@ -45,6 +46,9 @@ class ApplicationRequestType(Enum):
 NamespaceId = str
 WorkflowId = str
 ProtocolInstanceId = str
+# (type name, id): identifies an entity across the events of a simulation. The
+# type name may be qualified by a namespace (see read_events).
+EntityKey = tuple[str, int]
 
 
 @dataclass
@@ -69,14 +73,19 @@ class Entity(Model):
 
     id: int
     time: int
+    # Computed once, when the entity is decoded.
+    key: EntityKey = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.key = (type(self).__name__, self.id)
 
     # TODO: Python bug?? Didn't seem possible to override __hash__.
     # See https://github.com/python/cpython/blob/3.12/Lib/dataclasses.py#L136
-    def hash_key(self) -> int:
-        return hash((type(self).__name__, self.id))
+    def hash_key(self) -> EntityKey:
+        return self.key
 
     def __eq__(self, other: Any) -> bool:
-        return isinstance(other, type(self)) and hash(self) == hash(other)
+        return isinstance(other, type(self)) and self.key == other.key
 
 
 @dataclass
@@ -189,13 +198,20 @@ class ActivityTaskCompleted(WorkerRequest):
 @dataclass
 class InitEvent(Model):
     """
-    The first event emitted by a simulation must be of this type. Its purpose is
+    The first event emitted by a simulation must be of this type (InternEvent
+    records, which are not events in this sense, may precede it). Its purpose is
     to declare the identities of the actor instances that will be involved in
     the simulation. A renderer will typically use this event to position the
     actors in the scene, and establish a mapping between these graphical
     components and the actor ids, so that actors referenced in subsequent
     StateChange and Message events can be mapped to their graphical components
     in the animation.
+
+    `lamport_skew` is a guarantee made by the simulation: no event will have a
+    Lamport time more than `lamport_skew` below that of any event emitted
+    before it. A renderer may rely on this to sort the event stream by Lamport
+    time within a bounded window, instead of reading the whole stream first.
+    If it is None then no guarantee is made.
     """
 
     server: Server
@@ -203,6 +219,7 @@ class InitEvent(Model):
     workflow_workers: list[WorkflowWorker]
     activity_workers: list[ActivityWorker]
     title: str
+    lamport_skew: int | None = field(default=None, kw_only=True)
 
 
 @dataclass
@@ -244,21 +261,92 @@ class NexusInitEvent(InitEvent):
     nexus_workers: list[NexusWorker]
 
 
+@dataclass
+class InternEvent(Model):
+    """
+    A record defining a large immutable string (e.g. the code of an entity)
+    once. Subsequent events refer to the string by id, via an InternedString in
+    place of the string itself. Intern records may precede the InitEvent; they
+    are consumed by the decoder and are not yielded as events.
+    """
+
+    id: int
+    value: str
+
+
+@dataclass
+class InternedString(Model):
+    """
+    A reference to the string defined by the InternEvent with the same id.
+    """
+
+    id: int
+
+
 type Event = StateChangeEvent | MessageEvent | InitEvent
 
 
-def from_serializable(data: Any) -> Any:
+# Strings defined by InternEvents. Decoded references resolve to the same str
+# object, so that a renderer holds a single copy of each.
+interned_strings: dict[int, str] = {}
+
+
+def read_events(
+    file: IO[str],
+    interned: dict[int, str] | None = None,
+    namespace: str | None = None,
+) -> Iterator[Event]:
+    """
+    Decode events from a JSONL stream, resolving interned strings. Lines are
+    decoded as they arrive, so that a consumer can process the events of a
+    simulation that is still running.
+
+    To decode the streams of several simulations at once, give each its own
+    table of `interned` strings, and a `namespace` qualifying the keys of its
+    entities, so that they are distinct from those of the other simulations.
+    """
+    if interned is None:
+        interned = interned_strings
+    for line in file:
+        match event := from_serializable(json.loads(line), interned, namespace):
+            case InternEvent():
+                interned[event.id] = event.value
+            case _:
+                yield cast(Event, event)
+
+
+def serialized_lamport_time(data: dict[str, Any]) -> int | None:
+    """
+    Return the Lamport time of serialized event `data`, or None if it is not a
+    timed event.
+    """
+    match data["_type"]:
+        case "StateChangeEvent":
+            return data["entity"]["time"]
+        case "MessageEvent":
+            return data["sender"]["time"]
+        case _:
+            return None
+
+
+def from_serializable(
+    data: Any, interned: dict[int, str] | None = None, namespace: str | None = None
+) -> Any:
     if isinstance(data, dict):
-        data = {k: from_serializable(v) for k, v in data.items()}
+        if data.get("_type") == InternedString.__name__:
+            return (interned_strings if interned is None else interned)[data["id"]]
+        data = {k: from_serializable(v, interned, namespace) for k, v in data.items()}
         if "_type" in data:
             cls = getattr(sys.modules[__name__], data["_type"])
             if issubclass(cls, Enum):
                 return cls(data["value"])
-            else:
-                return cls(**data)
+            obj = cls(**data)
+            if namespace is not None and isinstance(obj, Entity):
+                obj.key = (f"{namespace}:{obj.key[0]}", obj.id)
+            return obj
         else:
             return data
     elif isinstance(data, list):
-        return [from_serializable(v) for v in data]
+        return [from_serializable(v, interned, namespace) for v in data]
     else:
         return data
@@ -0,0 +1,400 @@
+"""
+A backend-neutral timeline of the animation of a simulation.
+
+The timeline compiler interprets a stream of events: it orders them by Lamport
+time, groups message animations by Lamport tick, chooses the proxy class
+displaying each new message, and schedules the animation at normal speed. The
+result is a stream of operations (render the new state of an entity, send a
+message, play the pending message animations, end a Lamport tick), each with
+the Lamport time of its event and its start time in seconds. A renderer
+replays the operations (see manim_renderer.event_processor.replay_timeline),
+and the timing of an animation can be examined without rendering it.
+
+Timelines are serialized as JSON lines, one operation per line, with long
+strings interned as in event files, so that they can be cached by the hash of
+their event file (see cached_timeline()) and diffed.
+"""
+import hashlib
+import heapq
+import json
+import os
+from dataclasses import dataclass, field, fields
+from enum import Enum
+from typing import IO, Any, Iterable, Iterator
+
+from common.cache import atomic_write, cache_dir
+from schema import schema
+
+# Durations at normal speed, in seconds. See
+# ProxyEntity.play_all_send_message_animations and WorkflowWorker.render_to_scene.
+RUN_TIME = 1.0
+MESSAGE_PAUSE = 0.5
+# manim's DEFAULT_WAIT_TIME
+DEFAULT_WAIT_TIME = 1.0
+CACHE_DIR = cache_dir("timelines")
+# Strings at least this long are interned in serialized timelines.
+INTERN_MIN_LENGTH = 64
+
+
+@dataclass
+class Op:
+    # The Lamport time of the event from which the operation was compiled.
+    time: int
+    # The start of the operation, in seconds at normal speed.
+    start: float
+    # The run time of the animations played by the operation, and the
+    # duration of its waits, in seconds at normal speed.
+    run_time: float = field(default=0.0, kw_only=True)
+    wait_time: float = field(default=0.0, kw_only=True)
+
+
+@dataclass
+class RenderState(Op):
+    """
+    Render the new state of `entity`.
+    """
+
+    entity: schema.Entity
+
+
+@dataclass
+class SendMessage(Op):
+    """
+    Create (but do not play) the animation of `message`. A message at its
+    request stage is new, and is displayed by a proxy of class `proxy_cls`.
+    """
+
+    sender: schema.Entity
+    receiver: schema.Entity
+    message: schema.RequestResponse
+    proxy_cls: str | None
+
+
+@dataclass
+class PlayMessages(Op):
+    """
+    Play the pending message animations together.
+    """
+
+
+@dataclass
+class EndTick(Op):
+    """
+    All events up to Lamport time `tick` have been rendered.
+    """
+
+    tick: int
+
+
+OP_TYPES: dict[str, type[Op]] = {
+    cls.__name__: cls for cls in [RenderState, SendMessage, PlayMessages, EndTick]
+}
+
+
+def lamport_time(event: schema.Event) -> int:
+    match event:
+        case schema.StateChangeEvent():
+            return event.entity.time
+        case schema.MessageEvent():
+            return event.sender.time
+        case schema.InitEvent():
+            raise ValueError("Invalid event")
+
+
+def in_lamport_order(
+    events: Iterable[schema.Event], lamport_skew: int | None
+) -> Iterator[schema.Event]:
+    """
+    Yield `events` stably sorted by Lamport time.
+
+    If the simulation declared a `lamport_skew` in its InitEvent, then only
+    events within that window of the latest Lamport time seen are held back,
+    so that events are yielded while the simulation is still producing them.
+    Otherwise the whole stream must be read first.
+    """
+    if lamport_skew is None:
+        yield from sorted(events, key=lamport_time)
+        return
+
+    pending: list[tuple[int, int, schema.Event]] = []
+    max_time = released_time = -1
+    for seq, event in enumerate(events):
+        time = lamport_time(event)
+        if time < released_time:
+            raise ValueError(
+                f"Event at Lamport time {time} arrived after events at time "
+                f"{released_time} were released: the simulation violated its "
+                f"declared lamport_skew ({lamport_skew})"
+            )
+        heapq.heappush(pending, (time, seq, event))
+        max_time = max(max_time, time)
+        # No event yet to arrive can be earlier than max_time - lamport_skew.
+        while pending and pending[0][0] <= max_time - lamport_skew:
+            released_time, _, event = heapq.heappop(pending)
+            yield event
+    while pending:
+        yield heapq.heappop(pending)[2]
+
+
+def compile_timeline(
+    events: Iterable[schema.Event], lamport_skew: int | None = None
+) -> Iterator[Op]:
+    """
+    Yield the operations animating `events`, as they are compiled. Message
+    animations are played together per Lamport tick.
+    """
+    return TimelineCompiler().compile(events, lamport_skew)
+
+
+class TimelineCompiler:
+    def __init__(self):
+        self.clock = 0.0
+        self.curr_time = -1
+        # The pending message animations: their number, and whether any is of
+        # a response (which is faded out).
+        self.n_messages = 0
+        self.has_response = False
+        # Whether new children are waiting to be indicated, and the number of
+        # children of each entity.
+        self.indicating = False
+        self.n_children: dict[schema.EntityKey, int] = {}
+
+    def compile(
+        self, events: Iterable[schema.Event], lamport_skew: int | None
+    ) -> Iterator[Op]:
+        for event in in_lamport_order(events, lamport_skew):
+            time = lamport_time(event)
+            if time > self.curr_time:
+                yield from self.end_tick(time)
+                self.curr_time = time
+
+            match event:
+                case schema.StateChangeEvent(entity=entity):
+                    n = count_children(entity)
+                    if n > self.n_children.get(entity.key, n):
+                        self.indicating = True
+                    self.n_children[entity.key] = n
+                    if isinstance(entity, schema.WorkflowWorker):
+                        # WorkflowWorker.render_to_scene waits.
+                        yield self.advance(
+                            RenderState(
+                                time,
+                                self.clock,
+                                entity,
+                                run_time=self.take_indications(),
+                                wait_time=DEFAULT_WAIT_TIME,
+                            )
+                        )
+                    else:
+                        yield RenderState(time, self.clock, entity)
+                case schema.MessageEvent():
+                    proxy_cls = None
+                    if event.message.stage == schema.RequestResponseStage.Request:
+                        proxy_cls = message_proxy_cls(event.sender, event.message)
+                    yield SendMessage(
+                        time,
+                        self.clock,
+                        event.sender,
+                        event.receiver,
+                        event.message,
+                        proxy_cls,
+                    )
+                    self.n_messages += 1
+                    self.has_response |= (
+                        event.message.stage == schema.RequestResponseStage.Response
+                    )
+        yield from self.end_tick(self.curr_time)
+
+    def end_tick(self, time: int) -> Iterator[Op]:
+        yield from self.play_messages(time)
+        if self.curr_time >= 0:
+            yield self.advance(
+                EndTick(
+                    time, self.clock, self.curr_time, run_time=self.take_indications()
+                )
+            )
+
+    def play_messages(self, time: int) -> Iterator[Op]:
+        if self.n_messages:
+            run_time = 2 * RUN_TIME + (RUN_TIME if self.has_response else 0)
+            yield self.advance(
+                PlayMessages(
+                    time,
+                    self.clock,
+                    run_time=self.take_indications() + run_time,
+                    wait_time=MESSAGE_PAUSE + DEFAULT_WAIT_TIME,
+                )
+            )
+            self.n_messages = 0
+            self.has_response = False
+
+    def take_indications(self) -> float:
+        """
+        Return the run time of the pending Indicate animations, which are
+        played before any other animation or wait.
+        """
+        if not self.indicating:
+            return 0.0
+        self.indicating = False
+        return RUN_TIME
+
+    def advance[O: Op](self, op: O) -> O:
+        self.clock += op.run_time + op.wait_time
+        return op
+
+
+def duration(ops: Iterable[Op]) -> tuple[float, float]:
+    """
+    Return the total run time of animations, and the total duration of waits,
+    of `ops`, in seconds at normal speed.
+    """
+    run_time = wait_time = 0.0
+    for op in ops:
+        run_time += op.run_time
+        wait_time += op.wait_time
+    return run_time, wait_time
+
+
+def message_proxy_cls(
+    sender_entity: schema.Entity, message_entity: schema.RequestResponse
+) -> str:
+    """
+    Return the name of the class of proxy displaying a new message.
+    """
+    match message_entity, sender_entity:
+        case (schema.ApplicationRequest(), _):
+            return "ApplicationRequest"
+        case (schema.WorkerPollRequest(), schema.WorkflowWorker()):
+            return "WorkflowTaskRequest"
+        case (schema.WorkerRequest(), schema.WorkflowWorker()):
+            return "WorkflowTaskCompleted"
+        case (schema.WorkerPollRequest(), schema.ActivityWorker()):
+            return "ActivityTaskRequest"
+        case (schema.WorkerRequest(), schema.ActivityWorker()):
+            return "ActivityTaskCompleted"
+        case _:
+            raise ValueError(
+                "Unsupported (message, sender) types: "
+                f"{(type(message_entity).__name__, type(sender_entity).__name__)}"
+            )
+
+
+def count_children(entity: schema.Entity) -> int:
+    """
+    Return the number of child mobjects displayed for `entity`, across all
+    levels of nesting.
+    """
+    match entity:
+        case schema.Server():
+            return sum(
+                1 + len(workflow_data.history.events)
+                for shard in entity.shards
+                for namespace in shard.values()
+                for workflow_data in namespace.values()
+            )
+        case schema.WorkflowWorker():
+            return len(entity.workflows)
+        case _:
+            return 0
+
+
+class TimelineWriter:
+    """
+    Write operations as JSON lines, preceded by InternEvent records defining
+    the long strings that they contain.
+    """
+
+    def __init__(self, file: IO[str]):
+        self.file = file
+        self.interned: dict[str, int] = {}
+
+    def write(self, op: Op):
+        data = {
+            "op": type(op).__name__,
+            **{f.name: self.to_serializable(getattr(op, f.name)) for f in fields(op)},
+        }
+        print(json.dumps(data), file=self.file)
+
+    def to_serializable(self, value: Any) -> Any:
+        match value:
+            case Enum():
+                return {
+                    "_type": type(value).__name__,
+                    "value": value.value,
+                    "name": value.name,
+                }
+            case schema.Model():
+                return {
+                    f.name: self.to_serializable(getattr(value, f.name))
+                    for f in fields(value)
+                    if f.init
+                }
+            case dict():
+                return {k: self.to_serializable(v) for k, v in value.items()}
+            case list() | tuple() | set() | frozenset():
+                return [self.to_serializable(v) for v in value]
+            case str() if len(value) >= INTERN_MIN_LENGTH:
+                return self.intern(value)
+            case _:
+                return value
+
+    def intern(self, value: str) -> dict[str, Any]:
+        if (id := self.interned.get(value)) is None:
+            id = self.interned[value] = len(self.interned)
+            record = {"_type": schema.InternEvent.__name__, "id": id, "value": value}
+            print(json.dumps(record), file=self.file)
+        return {"_type": schema.InternedString.__name__, "id": id}
+
+
+def read_timeline(file: IO[str], namespace: str | None = None) -> Iterator[Op]:
+    """
+    Decode operations written by TimelineWriter. See schema.read_events for
+    `namespace`.
+    """
+    interned: dict[int, str] = {}
+    for line in file:
+        data = json.loads(line)
+        if data.get("_type") == schema.InternEvent.__name__:
+            interned[data["id"]] = data["value"]
+            continue
+        cls = OP_TYPES[data.pop("op")]
+        yield cls(
+            **{
+                k: schema.from_serializable(v, interned, namespace)
+                for k, v in data.items()
+            }
+        )
+
+
+def cached_timeline(
+    events_file: str,
+    events: Iterable[schema.Event],
+    lamport_skew: int | None = None,
+) -> Iterator[Op]:
+    """
+    Yield the operations animating `events`, which are those of
+    `events_file`: from the cache if they have been compiled before, and
+    otherwise as they are compiled, caching them.
+    """
+    key = timeline_key(events_file)
+    path = os.path.join(CACHE_DIR, key[:2], f"{key}.jsonl")
+    if os.path.exists(path):
+        with open(path) as file:
+            yield from read_timeline(file)
+        return
+    with atomic_write(path) as file:
+        writer = TimelineWriter(file)
+        for op in compile_timeline(events, lamport_skew):
+            writer.write(op)
+            yield op
+
+
+def timeline_key(events_file: str) -> str:
+    """
+    Hash the content of `events_file` and the source of the compiler.
+    """
+    h = hashlib.sha256()
+    for path in [events_file, __file__, schema.__file__]:
+        with open(path, "rb") as file:
+            h.update(hashlib.file_digest(file, "sha256").digest())
+    return h.hexdigest()
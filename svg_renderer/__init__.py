@@ -0,0 +1,11 @@
+"""
+Render actor state change and message events as a static sequence diagram.
+
+Unlike manim_renderer, this needs nothing beyond the standard library, and
+renders a scene in milliseconds: it is intended for quick previews, e.g. in
+code review and documentation.
+"""
+# pyright: reportUnusedImport=false
+from svg_renderer.diagram import Diagram, build_diagram
+from svg_renderer.page import render_html
+from svg_renderer.svg import render_svg
@@ -0,0 +1,40 @@
+"""
+Usage:
+
+    python scenes/CallActivity.py | python -m svg_renderer -o CallActivity.svg
+    python -m svg_renderer scenes/events/CallActivity.jsonl --html CallActivity.html
+"""
+import argparse
+import sys
+
+from schema import schema
+from svg_renderer import build_diagram, render_html, render_svg
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Render events as an SVG sequence diagram."
+    )
+    parser.add_argument("events_file", nargs="?", help="default: standard input")
+    parser.add_argument("-o", "--output", help="SVG file to write")
+    parser.add_argument("--html", help="HTML page with a Lamport time scrubber")
+    args = parser.parse_args()
+
+    if args.events_file:
+        with open(args.events_file) as file:
+            diagram = build_diagram(schema.read_events(file))
+    else:
+        diagram = build_diagram(schema.read_events(sys.stdin))
+
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(render_svg(diagram))
+    if args.html:
+        with open(args.html, "w") as file:
+            file.write(render_html(diagram))
+    if not (args.output or args.html):
+        sys.stdout.write(render_svg(diagram))
+
+
+if __name__ == "__main__":
+    main()
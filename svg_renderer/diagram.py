@@ -0,0 +1,190 @@
+"""
+The layout-independent content of a sequence diagram: a lane for each actor,
+and a sequence of steps (messages between lanes, and annotations describing
+state changes on a lane) in Lamport time order.
+"""
+from dataclasses import dataclass
+from typing import Iterable, cast
+
+from schema import schema
+from schema.timeline import lamport_time
+
+
+@dataclass
+class Lane:
+    key: schema.EntityKey
+    label: str
+
+
+@dataclass
+class Message:
+    time: int
+    sender: schema.EntityKey
+    receiver: schema.EntityKey
+    label: str
+    response: bool
+
+
+@dataclass
+class Annotation:
+    time: int
+    lane: schema.EntityKey
+    text: str
+
+
+type Step = Message | Annotation
+
+
+@dataclass
+class Diagram:
+    title: str
+    lanes: list[Lane]
+    steps: list[Step]
+
+
+def build_diagram(events: Iterable[schema.Event]) -> Diagram:
+    """
+    Build the diagram for a stream of events, the first of which must be an
+    InitEvent.
+    """
+    events = iter(events)
+    match init_event := next(events):
+        case schema.InitEvent():
+            pass
+        case _:
+            raise ValueError("The first event must be an InitEvent")
+    lanes = get_lanes(init_event)
+    lane_keys = {lane.key for lane in lanes}
+    # The lane on which the state changes of a non-actor entity without an
+    # owner are annotated.
+    default_key = (
+        init_event.workflow_workers[0].key
+        if init_event.workflow_workers
+        else init_event.server.key
+    )
+    # The lane on which the state changes of a non-actor entity are annotated.
+    owners: dict[schema.EntityKey, schema.EntityKey] = {}
+    previous: dict[schema.EntityKey, schema.Entity] = {}
+    steps: list[Step] = []
+
+    for event in sorted(cast(Iterable[schema.Event], events), key=lamport_time):
+        match event:
+            case schema.StateChangeEvent(entity=entity):
+                if isinstance(entity, schema.WorkflowWorker):
+                    for workflow in entity.workflows:
+                        owners[workflow.key] = entity.key
+                text = describe_state_change(previous.get(entity.key), entity)
+                previous[entity.key] = entity
+                if text:
+                    lane = (
+                        entity.key
+                        if entity.key in lane_keys
+                        else owners.get(entity.key, default_key)
+                    )
+                    steps.append(Annotation(entity.time, lane, text))
+            case schema.MessageEvent(sender=sender, receiver=receiver, message=message):
+                steps.append(
+                    Message(
+                        sender.time,
+                        sender.key,
+                        receiver.key,
+                        message_label(message),
+                        message.stage == schema.RequestResponseStage.Response,
+                    )
+                )
+    return Diagram(init_event.title, lanes, steps)
+
+
+def get_lanes(event: schema.InitEvent) -> list[Lane]:
+    actors: list[tuple[str, list[schema.Entity]]] = [
+        ("Your Application", list(event.apps)),
+        ("Temporal Server", [event.server]),
+    ]
+    if isinstance(event, schema.NexusInitEvent):
+        actors.append(("Nexus Server", [event.nexus_server]))
+    actors += [
+        ("Workflow Worker", list(event.workflow_workers)),
+        ("Activity Worker", list(event.activity_workers)),
+    ]
+    if isinstance(event, schema.NexusInitEvent):
+        actors.append(("Nexus Worker", list(event.nexus_workers)))
+    return [
+        Lane(entity.key, label if len(entities) == 1 else f"{label} {i}")
+        for label, entities in actors
+        for i, entity in enumerate(entities, 1)
+    ]
+
+
+def message_label(message: schema.RequestResponse) -> str:
+    match message:
+        case schema.ApplicationRequest(
+            stage=schema.RequestResponseStage.Response, response_payload=payload
+        ) if payload:
+            return str(payload)
+        case schema.ApplicationRequest():
+            return message.request_type.name
+        case schema.WorkerPollRequest(stage=schema.RequestResponseStage.Request):
+            return "Poll"
+        case schema.WorkerPollRequest(task=schema.WorkflowTask()):
+            return "WFT"
+        case schema.WorkerPollRequest():
+            return "Activity Task"
+        case schema.WorkflowTaskCompleted():
+            return "WFT Completed"
+        case schema.ActivityTaskCompleted():
+            return "Activity Task Completed"
+        case _:
+            return type(message).__name__
+
+
+def describe_state_change(
+    previous: schema.Entity | None, entity: schema.Entity
+) -> str | None:
+    """
+    Describe what has changed in `entity` since its `previous` state, or
+    return None if there is nothing worth showing.
+    """
+    match entity:
+        case schema.Server():
+            seen = (
+                {e.id for e in history_events(cast(schema.Server, previous))}
+                if previous
+                else set()
+            )
+            new_events = [
+                e.event_type.name for e in history_events(entity) if e.id not in seen
+            ]
+            return ", ".join(new_events) or None
+        case schema.WorkflowWorker():
+            before = (
+                len(cast(schema.WorkflowWorker, previous).workflows) if previous else 0
+            )
+            after = len(entity.workflows)
+            if after > before:
+                return "workflow started"
+            elif after < before:
+                return "workflow evicted"
+            else:
+                return None
+        case schema.EntityWithCode():
+            if previous and (
+                cast(schema.EntityWithCode, previous).blocked_lines
+                == entity.blocked_lines
+            ):
+                return None
+            elif entity.blocked_lines:
+                lines = ", ".join(map(str, sorted(entity.blocked_lines)))
+                return f"blocked at line {lines}"
+            elif previous:
+                return "unblocked"
+            else:
+                return None
+        case _:
+            return None
+
+
+def history_events(server: schema.Server) -> Iterable[schema.HistoryEvent]:
+    for shard in server.shards:
+        for namespace in shard.values():
+            for workflow_data in namespace.values():
+                yield from workflow_data.history.events
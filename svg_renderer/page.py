@@ -0,0 +1,61 @@
+"""
+A self-contained HTML page displaying the sequence diagram, with a scrubber
+over Lamport time: steps after the selected time are hidden, and those at the
+selected time are highlighted.
+"""
+from html import escape
+
+from svg_renderer.diagram import Diagram
+from svg_renderer.svg import COLOR_BACKGROUND, COLOR_TEXT, render_svg
+
+SCRIPT = """
+const steps = [...document.querySelectorAll(".step")];
+const scrubber = document.getElementById("scrubber");
+const label = document.getElementById("time");
+function show(time) {
+  label.textContent = time;
+  let current = null;
+  for (const step of steps) {
+    const t = Number(step.dataset.time);
+    step.style.display = t <= time ? "" : "none";
+    step.style.opacity = t === time ? 1 : 0.5;
+    if (t === time && !current) current = step;
+  }
+  if (current) current.scrollIntoView({block: "center", behavior: "smooth"});
+}
+scrubber.addEventListener("input", () => show(Number(scrubber.value)));
+document.addEventListener("keydown", (event) => {
+  const delta = {ArrowRight: 1, ArrowLeft: -1}[event.key];
+  if (delta) {
+    scrubber.value = Number(scrubber.value) + delta;
+    show(Number(scrubber.value));
+  }
+});
+show(Number(scrubber.value));
+"""
+
+
+def render_html(diagram: Diagram) -> str:
+    times = [step.time for step in diagram.steps] or [0]
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{escape(diagram.title)}</title>
+<style>
+body {{ background: {COLOR_BACKGROUND}; color: {COLOR_TEXT}; font-family: sans-serif; }}
+#controls {{ position: sticky; top: 0; background: {COLOR_BACKGROUND}; padding: 8px; }}
+#scrubber {{ width: 60%; }}
+</style>
+</head>
+<body>
+<div id="controls">
+<strong>{escape(diagram.title)}</strong>
+<input id="scrubber" type="range" min="{min(times)}" max="{max(times)}" value="{max(times)}">
+Lamport time <span id="time"></span>
+</div>
+{render_svg(diagram)}
+<script>{SCRIPT}</script>
+</body>
+</html>
+"""
@@ -0,0 +1,104 @@
+"""
+Lay out a Diagram as an SVG sequence diagram: actors are vertical lanes, and
+each step occupies a row, with Lamport time increasing down the page.
+"""
+from html import escape
+
+from svg_renderer.diagram import Annotation, Diagram, Message
+
+LANE_WIDTH = 200
+ROW_HEIGHT = 30
+HEADER_HEIGHT = 60
+GUTTER_WIDTH = 60
+MARGIN = 20
+FONT_SIZE = 12
+# Approximate width of a character of the label font, used to size boxes.
+CHAR_WIDTH = 7
+
+COLOR_BACKGROUND = "#1D1D1D"
+COLOR_TEXT = "#DDDDDD"
+COLOR_LANE = "#555555"
+COLOR_MESSAGE = "#58C4DD"
+COLOR_RESPONSE = "#83C167"
+COLOR_ANNOTATION = "#FF862F"
+
+STYLE = f"""
+text {{ font-family: sans-serif; font-size: {FONT_SIZE}px; fill: {COLOR_TEXT}; }}
+.actor {{ font-size: {FONT_SIZE + 2}px; font-weight: bold; }}
+.time {{ fill: {COLOR_LANE}; }}
+.lane {{ stroke: {COLOR_LANE}; stroke-dasharray: 4 4; }}
+.message line {{ stroke: {COLOR_MESSAGE}; marker-end: url(#arrow); }}
+.message.response line {{ stroke: {COLOR_RESPONSE}; stroke-dasharray: 6 3; }}
+.annotation rect {{ fill: {COLOR_BACKGROUND}; stroke: {COLOR_ANNOTATION}; }}
+.annotation text {{ fill: {COLOR_ANNOTATION}; }}
+"""
+
+
+def render_svg(diagram: Diagram) -> str:
+    """
+    Return an SVG document for `diagram`. Every step is an element of class
+    "step" with a data-time attribute holding its Lamport time.
+    """
+    lane_x = {
+        lane.key: GUTTER_WIDTH + LANE_WIDTH * i + LANE_WIDTH // 2
+        for i, lane in enumerate(diagram.lanes)
+    }
+    width = GUTTER_WIDTH + LANE_WIDTH * len(diagram.lanes) + MARGIN
+    height = HEADER_HEIGHT + ROW_HEIGHT * len(diagram.steps) + MARGIN
+    elements = [
+        f'<rect width="{width}" height="{height}" fill="{COLOR_BACKGROUND}"/>',
+    ]
+    for lane in diagram.lanes:
+        x = lane_x[lane.key]
+        elements.append(
+            f'<text class="actor" x="{x}" y="{MARGIN + FONT_SIZE}" '
+            f'text-anchor="middle">{escape(lane.label)}</text>'
+        )
+        elements.append(
+            f'<line class="lane" x1="{x}" y1="{HEADER_HEIGHT - MARGIN}" '
+            f'x2="{x}" y2="{height - MARGIN}"/>'
+        )
+
+    prev_time = None
+    for i, step in enumerate(diagram.steps):
+        y = HEADER_HEIGHT + ROW_HEIGHT * i + ROW_HEIGHT // 2
+        if step.time != prev_time:
+            elements.append(
+                f'<text class="time" x="{MARGIN}" y="{y + FONT_SIZE // 3}">'
+                f"{step.time}</text>"
+            )
+            prev_time = step.time
+        match step:
+            case Message():
+                x1, x2 = lane_x[step.sender], lane_x[step.receiver]
+                classes = "step message response" if step.response else "step message"
+                elements.append(
+                    f'<g class="{classes}" data-time="{step.time}">'
+                    f'<line x1="{x1}" y1="{y}" x2="{x2}" y2="{y}"/>'
+                    f'<text x="{(x1 + x2) // 2}" y="{y - 4}" text-anchor="middle">'
+                    f"{escape(step.label)}</text></g>"
+                )
+            case Annotation():
+                x = lane_x[step.lane]
+                box_width = len(step.text) * CHAR_WIDTH + 10
+                box_height = ROW_HEIGHT - 8
+                elements.append(
+                    f'<g class="step annotation" data-time="{step.time}">'
+                    f'<rect x="{x - box_width // 2}" y="{y - box_height // 2}" '
+                    f'width="{box_width}" height="{box_height}" rx="4"/>'
+                    f'<text x="{x}" y="{y + FONT_SIZE // 3}" text-anchor="middle">'
+                    f"{escape(step.text)}</text></g>"
+                )
+
+    body = "\n".join(elements)
+    return f"""<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}">
+<title>{escape(diagram.title)}</title>
+<defs>
+<marker id="arrow" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="8" markerHeight="8" orient="auto-start-reverse">
+<path d="M 0 0 L 10 5 L 0 10 z" fill="{COLOR_MESSAGE}"/>
+</marker>
+</defs>
+<style>{STYLE}</style>
+{body}
+</svg>
+"""
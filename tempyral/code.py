@@ -25,6 +25,8 @@ class WithCode:
         "blocked_lines",
         "active",
     }
+    # The code never changes, so it is emitted once and referred to by id.
+    __intern__ = {"code"}
 
     def _get_language(self) -> Language:
         available_languages = list(COMMENT_MARKERS)
@@ -35,7 +35,14 @@ class Entity:
 
 def to_serializable(obj: Any) -> dict | list | int | bool | str | None:
     if isinstance(obj, Entity):
-        data = {k: to_serializable(getattr(obj, k)) for k in obj.__publish__}
+        # TODO: circular
+        from tempyral.event import intern_string
+
+        interned = getattr(obj, "__intern__", set())
+        data = {
+            k: (intern_string if k in interned else to_serializable)(getattr(obj, k))
+            for k in obj.__publish__
+        }
         schema_cls = next(
             filter(
                 None,
@@ -1,6 +1,9 @@
 import json
+import os
 from typing import TYPE_CHECKING, Any
 
+from schema.index import IndexWriter
+from schema.schema import serialized_lamport_time
 from tempyral.entity import to_serializable
 
 if TYPE_CHECKING:
@@ -18,13 +21,17 @@ def _get_init_event_data(
     workflow_workers: list["WorkflowWorker"],
     activity_workers: list["ActivityWorker"],
     title: str,
+    lamport_skew: int,
 ) -> dict[str, Any]:
+    global _lamport_skew
+    _lamport_skew = lamport_skew
     return dict(
         server=to_serializable(server),
         apps=[to_serializable(a) for a in apps],
         workflow_workers=[to_serializable(w) for w in workflow_workers],
         activity_workers=[to_serializable(w) for w in activity_workers],
         title=title,
+        lamport_skew=lamport_skew,
     )
 
 
@@ -34,11 +41,12 @@ def emit_init_event(
     workflow_workers: list["WorkflowWorker"],
     activity_workers: list["ActivityWorker"],
     title: str,
+    lamport_skew: int,
 ):
     _emit(
         dict(
             _get_init_event_data(
-                server, apps, workflow_workers, activity_workers, title
+                server, apps, workflow_workers, activity_workers, title, lamport_skew
             ),
             _type="InitEvent",
         )
@@ -53,11 +61,12 @@ def emit_nexus_init_event(
     nexus_server: "NexusServer | None",
     nexus_workers: "list[NexusWorker]",
     title: str,
+    lamport_skew: int,
 ):
     _emit(
         dict(
             _get_init_event_data(
-                server, apps, workflow_workers, activity_workers, title
+                server, apps, workflow_workers, activity_workers, title, lamport_skew
             ),
             nexus_server=to_serializable(nexus_server),
             nexus_workers=[to_serializable(w) for w in nexus_workers],
@@ -70,10 +79,11 @@ _last_emitted_state = {}
 
 
 def emit_change_event(entity: "Entity"):
-    state = _serialize(dict(entity=to_serializable(entity), _type="StateChangeEvent"))
+    data = dict(entity=to_serializable(entity), _type="StateChangeEvent")
+    state = _serialize(data)
     if state != _last_emitted_state.get(entity):
         _last_emitted_state[entity] = state
-        print(state, flush=True)
+        _write(data, state)
 
 
 def emit_message_event(
@@ -95,9 +105,53 @@ def emit_message_event(
     emit_change_event(receiver)
 
 
+_interned_strings: dict[str, int] = {}
+
+
+def intern_string(value: str) -> dict[str, Any]:
+    """
+    Return a reference to `value`, emitting an InternEvent defining it if this
+    is its first use.
+    """
+    if (id := _interned_strings.get(value)) is None:
+        id = _interned_strings[value] = len(_interned_strings) + 1
+        _emit(dict(id=id, value=value, _type="InternEvent"))
+    return dict(id=id, _type="InternedString")
+
+
 def _serialize(data: dict[str, Any]) -> str:
     return json.dumps(data, sort_keys=True)
 
 
 def _emit(data: dict[str, Any]):
-    print(_serialize(data), flush=True)
+    _write(data, _serialize(data))
+
+
+# If TEMPORAL_ANIMATIONS_INDEX_FILE is set, an index of the event stream is
+# written there as the events are emitted. See schema.index.
+_index_writer = (
+    IndexWriter(index_file)
+    if (index_file := os.getenv("TEMPORAL_ANIMATIONS_INDEX_FILE"))
+    else None
+)
+
+
+# The Lamport time skew declared in the InitEvent, and the greatest Lamport time
+# emitted so far.
+_lamport_skew: int | None = None
+_max_lamport_time = 0
+
+
+def _write(data: dict[str, Any], line: str):
+    global _max_lamport_time
+    if (time := serialized_lamport_time(data)) is not None:
+        if _lamport_skew is not None and time < _max_lamport_time - _lamport_skew:
+            raise ValueError(
+                f"Event at Lamport time {time} violates the declared lamport_skew "
+                f"({_lamport_skew}): an event at time {_max_lamport_time} "
+                "has already been emitted"
+            )
+        _max_lamport_time = max(_max_lamport_time, time)
+    print(line, flush=True)
+    if _index_writer:
+        _index_writer.write(data, line)
@@ -51,6 +51,7 @@ class NexusSimulation(Simulation):
             nexus_server,
             nexus_workers,
             self.__class__.__name__,
+            self.lamport_skew,
         )
 
         coros: list[Coroutine] = [w.poll(server) for w in wworkers + aworkers]
@@ -21,6 +21,11 @@ class Simulation:
 
     title: str = ""
 
+    # An upper bound on how far below the latest emitted Lamport time an event
+    # may be, declared in the InitEvent so that renderers can sort the event
+    # stream within a bounded window. Emission fails if it is exceeded.
+    lamport_skew: int = 32
+
     async def do_simulation(self):
         """
         Instantiate simulation entities, emit initial event, and run coroutines
@@ -33,7 +38,12 @@ class Simulation:
             [cls() for cls in self.activity_worker_classes],
         )
         emit_init_event(
-            server, apps, wworkers, aworkers, self.title or self.__class__.__name__
+            server,
+            apps,
+            wworkers,
+            aworkers,
+            self.title or self.__class__.__name__,
+            self.lamport_skew,
         )
 
         coros: list[Coroutine] = [w.poll(server) for w in wworkers + aworkers]
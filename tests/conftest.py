@@ -0,0 +1,9 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """
+    Keep the caches of renders out of the working tree.
+    """
+    monkeypatch.setenv("TEMPORAL_ANIMATIONS_CACHE_DIR", str(tmp_path / "cache"))
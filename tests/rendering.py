@@ -0,0 +1,33 @@
+"""
+Render TemporalScene in tests, counting frames instead of writing movies.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+EVENTS_FILE = "scenes/events/StartWorkflow.jsonl"
+
+
+def _render(events_file: str, attrs: dict) -> int:
+    from manim import config, tempconfig
+
+    from manim_renderer.scene import TemporalScene
+
+    with tempconfig(
+        {"quality": "low_quality", "write_to_movie": False, "disable_caching": True}
+    ):
+        scene = TemporalScene()
+        scene.events_file = events_file
+        for name, value in attrs.items():
+            setattr(scene, name, value)
+        scene.render()
+        # The renderer advances its time by each frame it renders.
+        return round(scene.renderer.time * config.frame_rate)
+
+
+def rendered_frames(events_file: str = EVENTS_FILE, **attrs) -> int:
+    """
+    Render the scene of `events_file` at low quality, with the TemporalScene
+    attributes `attrs`, and return the number of frames rendered. Proxies are
+    registered in module-level state, so each render is in a fresh process.
+    """
+    with ProcessPoolExecutor(1, max_tasks_per_child=1) as pool:
+        return pool.submit(_render, events_file, attrs).result()
@@ -0,0 +1,26 @@
+import os
+
+import pytest
+
+from common.cache import atomic_write, cache_dir
+
+
+def test_cache_dir(tmp_path):
+    assert cache_dir("timelines") == str(tmp_path / "cache" / "timelines")
+
+
+def test_atomic_write(tmp_path):
+    path = tmp_path / "a" / "entry"
+    with atomic_write(str(path)) as file:
+        file.write("partial")
+        assert not path.exists()
+    assert path.read_text() == "partial"
+
+
+def test_atomic_write_failure_leaves_no_file(tmp_path):
+    path = tmp_path / "a" / "entry"
+    with pytest.raises(RuntimeError):
+        with atomic_write(str(path), "wb") as file:
+            file.write(b"partial")
+            raise RuntimeError
+    assert os.listdir(path.parent) == []
@@ -0,0 +1,147 @@
+import fcntl
+import multiprocessing
+import os
+
+import pytest
+
+pytest.importorskip("manim")
+
+from manim_renderer.disk_cache import MobjectCache
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "style.py"
+    path.write_text("COLOR = 'red'\n")
+    return path
+
+
+def make_cache(tmp_path, source, max_size=1 << 20, renderer="cairo") -> MobjectCache:
+    return MobjectCache(
+        str(tmp_path / "cache"), max_size, sources=[str(source)], renderer=renderer
+    )
+
+
+def entries(cache: MobjectCache) -> list[str]:
+    return sorted(
+        entry.name
+        for subdir in os.scandir(cache.directory)
+        if subdir.is_dir()
+        for entry in os.scandir(subdir.path)
+    )
+
+
+def age(cache: MobjectCache, key: tuple, seconds: float):
+    """
+    Set the time of last use of the entry for `key` to `seconds` ago.
+    """
+    path = cache.path(key)
+    mtime = os.path.getmtime(path) - seconds
+    os.utime(path, (mtime, mtime))
+
+
+def test_miss_builds_and_hit_loads(tmp_path, source):
+    cache = make_cache(tmp_path, source)
+    assert cache.get(("text", "a"), lambda: ["built"]) == ["built"]
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    # Another process, e.g. the render of another scene.
+    other = make_cache(tmp_path, source)
+    assert other.get(("text", "a"), lambda: pytest.fail("rebuilt")) == ["built"]
+    assert (other.hits, other.misses) == (1, 0)
+
+
+def test_keys_are_distinct(tmp_path, source):
+    cache = make_cache(tmp_path, source)
+    cache.get(("text", "a"), lambda: "a")
+    assert cache.get(("text", "b"), lambda: "b") == "b"
+    assert len(entries(cache)) == 2
+
+
+def test_editing_a_source_invalidates(tmp_path, source):
+    make_cache(tmp_path, source).get(("text", "a"), lambda: "red")
+    source.write_text("COLOR = 'blue'\n")
+    cache = make_cache(tmp_path, source)
+    assert cache.get(("text", "a"), lambda: "blue") == "blue"
+    assert cache.misses == 1
+
+
+def test_another_renderer_misses(tmp_path, source):
+    make_cache(tmp_path, source).get(("text", "a"), lambda: "cairo")
+    cache = make_cache(tmp_path, source, renderer="opengl")
+    assert cache.get(("text", "a"), lambda: "opengl") == "opengl"
+    assert cache.misses == 1
+
+
+def test_corrupt_entry_is_rebuilt(tmp_path, source):
+    cache = make_cache(tmp_path, source)
+    cache.get(("text", "a"), lambda: "a")
+    with open(cache.path(("text", "a")), "wb") as file:
+        file.write(b"not a pickle")
+    assert make_cache(tmp_path, source).get(("text", "a"), lambda: "b") == "b"
+
+
+def test_unpicklable_value_is_not_cached(tmp_path, source):
+    cache = make_cache(tmp_path, source)
+    value = lambda: None  # noqa: E731
+    assert cache.get(("text", "a"), lambda: value) is value
+    assert not os.path.exists(cache.path(("text", "a")))
+
+
+def test_disabled(tmp_path, source):
+    cache = make_cache(tmp_path, source, max_size=0)
+    assert cache.get(("text", "a"), lambda: "a") == "a"
+    assert not os.path.exists(cache.directory)
+
+
+def test_eviction_removes_least_recently_used(tmp_path, source):
+    cache = make_cache(tmp_path, source, max_size=10_000)
+    keys = [("text", i) for i in range(10)]
+    for i, key in enumerate(keys):
+        cache.get(key, lambda: b"x" * 900)
+        age(cache, key, 100 - i)
+    # Reading the oldest entry makes it the most recently used.
+    make_cache(tmp_path, source).get(keys[0], lambda: pytest.fail("rebuilt"))
+
+    cache.get(("text", "new"), lambda: b"x" * 900)
+    cache.evict()
+    remaining = [k for k in [*keys, ("text", "new")] if os.path.exists(cache.path(k))]
+    size = sum(os.path.getsize(cache.path(k)) for k in remaining)
+    assert size <= 10_000 * 0.9
+    assert keys[0] in remaining
+    assert ("text", "new") in remaining
+    assert keys[1] not in remaining
+
+
+def test_eviction_is_skipped_while_another_process_evicts(tmp_path, source):
+    for i in range(3):
+        make_cache(tmp_path, source).get(("text", i), lambda: b"x" * 900)
+    cache = make_cache(tmp_path, source, max_size=1_000)
+    with open(os.path.join(cache.directory, "lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        cache.evict()
+        assert len(entries(cache)) == 3
+    cache.evict()
+    assert len(entries(cache)) <= 1
+
+
+def _hammer(directory: str, source: str, seed: int) -> list[str]:
+    cache = MobjectCache(directory, 20_000, sources=[source])
+    errors = []
+    for i in range(200):
+        key = ("text", (i * 7 + seed) % 40)
+        value = cache.get(key, lambda: [key[1]] * 300)
+        if value != [key[1]] * 300:
+            errors.append(f"{key}: {value!r}")
+    return errors
+
+
+def test_concurrent_processes(tmp_path, source):
+    directory = str(tmp_path / "cache")
+    context = multiprocessing.get_context("fork")
+    with context.Pool(4) as pool:
+        results = pool.starmap(_hammer, [(directory, str(source), s) for s in range(4)])
+    assert results == [[]] * 4
+    # No temporary files are left behind.
+    names = entries(MobjectCache(directory, 20_000, sources=[str(source)]))
+    assert all(name.endswith(".pickle") for name in names)
@@ -0,0 +1,14 @@
+import pytest
+
+pytest.importorskip("manim")
+
+from rendering import EVENTS_FILE, rendered_frames
+
+from manim_renderer.parallel import get_segments
+
+
+def test_segments_render_the_frames_of_a_serial_render():
+    segments = get_segments(EVENTS_FILE, 3)
+    assert len(segments) == 3
+    frames = [rendered_frames(from_time=s, to_time=e) for s, e in segments]
+    assert sum(frames) == rendered_frames()
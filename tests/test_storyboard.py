@@ -0,0 +1,23 @@
+import re
+
+import pytest
+
+pytest.importorskip("manim")
+
+from rendering import EVENTS_FILE, rendered_frames
+
+from schema.index import EventIndex
+
+
+def test_storyboard_saves_the_ticks_of_its_window(tmp_path):
+    index = EventIndex(EVENTS_FILE)
+    times = sorted(set(index.times))
+    index.close()
+    start, end = times[1], times[-1]
+    frames = rendered_frames(storyboard_dir=str(tmp_path), from_time=start, to_time=end)
+    assert frames == 0
+    html = (tmp_path / "index.html").read_text()
+    ticks = [int(t) for t in re.findall(r"<figcaption>Lamport time (\d+)<", html)]
+    assert ticks
+    assert all(start <= t < end for t in ticks)
+    assert len(list(tmp_path.glob("*.png"))) == len(ticks)
@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("manim")
+
+from rendering import rendered_frames
+
+from manim_renderer import timing
+from manim_renderer.timing import TimingPlan, plan_timing
+from schema.timeline import EndTick, PlayMessages
+
+# 2s of animations and 1.5s of waits in 4 plays and waits, and the final
+# wait: 5.5s, and a frame of rounding for each of 5 calls.
+OPS = [
+    PlayMessages(1, 0.0, run_time=2.0, wait_time=1.5),
+    EndTick(1, 3.5, 1),
+]
+
+
+@pytest.fixture(autouse=True)
+def frame_rate(monkeypatch):
+    monkeypatch.setattr(timing, "config", SimpleNamespace(frame_rate=10))
+
+
+def test_no_target():
+    assert plan_timing(OPS) == TimingPlan()
+
+
+def test_budget_fits():
+    assert plan_timing(OPS, frame_budget=60) == TimingPlan()
+
+
+def test_waits_are_compressed_first():
+    plan = plan_timing(OPS, frame_budget=45)
+    assert plan.run_time_scale == 1
+    assert plan.wait_scale == pytest.approx(2 / 3.5)
+
+
+def test_elapsed_time_is_deducted():
+    plan = plan_timing(OPS, target_duration=4.5, elapsed=1.0)
+    assert plan.wait_scale == pytest.approx(1 / 3.5)
+
+
+def test_animations_are_sped_up_without_waits():
+    plan = plan_timing(OPS, frame_budget=15)
+    assert plan == TimingPlan(run_time_scale=0.5, wait_scale=0.0)
+    assert plan_timing(OPS, frame_budget=1).run_time_scale == timing.MIN_RUN_TIME_SCALE
+
+
+def test_rendered_frames_are_within_budget():
+    # Rendered in another process, at the configured frame rate.
+    budget = rendered_frames() // 2
+    assert rendered_frames(frame_budget=budget) <= budget
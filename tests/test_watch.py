@@ -0,0 +1,56 @@
+import pytest
+
+pytest.importorskip("manim")
+
+from manim_renderer import watch
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    """
+    A source tree with a scene importing a module, and a renderer.
+    """
+    monkeypatch.chdir(tmp_path)
+    for path, source in {
+        "scenes/Scene.py": "from common import util\n",
+        "common/util.py": "X = 1\n",
+        "manim_renderer/scene.py": "",
+    }.items():
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text(source)
+    return tmp_path
+
+
+@pytest.fixture
+def watcher(tree, monkeypatch):
+    watcher = watch.Watcher(["Scene"], open_previews=False, renderer="cairo")
+    updates = []
+    monkeypatch.setattr(
+        watcher, "update", lambda *args: updates.append(tuple(map(list, args)))
+    )
+    watcher.updates = updates
+    return watcher
+
+
+def test_on_change_resimulates_dependent_scenes(watcher):
+    watcher.on_change({"common/util.py"})
+    assert watcher.updates == [(["Scene"], [])]
+
+
+def test_on_change_survives_a_syntax_error(tree, watcher, capsys):
+    (tree / "common/util.py").write_text("def f(:\n")
+    watcher.on_change({"common/util.py"})
+    assert watcher.updates == []
+    assert "SyntaxError" in capsys.readouterr().out
+
+    # Once fixed, the change is acted upon, with the one that failed.
+    (tree / "common/util.py").write_text("X = 2\n")
+    watcher.on_change({"manim_renderer/scene.py"})
+    assert watcher.updates == [(["Scene"], ["Scene"])]
+
+
+def test_on_change_survives_a_missing_scene(tree, watcher, capsys):
+    (tree / "scenes/Scene.py").unlink()
+    watcher.on_change({"scenes/Scene.py"})
+    assert watcher.updates == []
+    assert "FileNotFoundError" in capsys.readouterr().out
@@ -0,0 +1,18 @@
+import pytest
+
+pytest.importorskip("manim")
+
+from rendering import EVENTS_FILE, rendered_frames
+
+from schema.index import EventIndex
+
+
+def test_window_renders_only_its_ticks():
+    index = EventIndex(EVENTS_FILE)
+    times = sorted(set(index.times))
+    index.close()
+    start, end = times[len(times) // 3], times[2 * len(times) // 3]
+    # Nothing before `start` is rendered, including the initial waits.
+    assert rendered_frames(from_time=start, to_time=end) == rendered_frames(
+        to_time=end
+    ) - rendered_frames(to_time=start)